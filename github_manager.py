@@ -1,5 +1,6 @@
 import os
 import requests
+from requests.adapters import HTTPAdapter
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime, timezone
 import time
@@ -21,6 +22,24 @@ class GitHubManager:
             'Authorization': f'token {self.github_token}',
             'Accept': 'application/vnd.github.v3+json'
         })
+        # Keep a few connections open so API calls skip the TCP + TLS handshake
+        self.session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=4))
+        
+    def warm_up(self) -> bool:
+        """
+        Open a pooled connection to the GitHub API ahead of the first real call.
+        
+        Returns:
+            True if the API answered, False otherwise
+        """
+        try:
+            # rate_limit is free: it doesn't count against the rate limit
+            response = self.session.get('https://api.github.com/rate_limit', timeout=10)
+            response.raise_for_status()
+            return True
+        except requests.exceptions.RequestException as e:
+            print(f"Warning: Failed to warm up GitHub connection: {str(e)}")
+            return False
         
     def get_repository_issues(self, repo_url: str, since: Optional[str] = None) -> List[Dict]:
         """
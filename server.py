@@ -9,32 +9,332 @@ import time
 import threading
 import urllib.parse
 import subprocess
-import traceback
-from datetime import datetime, timezone
+import functools
+import contextlib
+import itertools
+import gzip
+import hashlib
+import logging
+import logging.handlers
+import queue
+import re
+from concurrent.futures import Future
+from datetime import datetime, timedelta, timezone
 from http import HTTPStatus
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
 from github_manager import GitHubManager
 
+try:
+    # Optional: C-accelerated JSON encoding and decoding
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Listener and handler installed by configure_logging()
+_log_listener: Optional[logging.handlers.QueueListener] = None
+_log_handler: Optional[logging.handlers.QueueHandler] = None
+
+# Escapes for control characters in logged request lines, matching
+# http.server.BaseHTTPRequestHandler
+_CONTROL_CHAR_TABLE = str.maketrans({
+    c: fr'\x{c:02x}' for c in itertools.chain(range(0x20), range(0x7f, 0xa0))
+})
+_CONTROL_CHAR_TABLE[ord('\\')] = r'\\'
+
+# Content types for static files, keyed by file extension
+_CONTENT_TYPES = {
+    '.css': 'text/css',
+    '.js': 'application/javascript',
+    '.html': 'text/html',
+    '.png': 'image/png',
+    '.jpg': 'image/jpeg',
+    '.gif': 'image/gif'
+}
+
+# Page size for GET /messages when no limit is given, and the largest allowed
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 1000
+
+# UPSERT ... RETURNING needs SQLite 3.35 or newer
+_SQLITE_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# Seconds to let a burst of messages settle before pushing to GitHub
+_PUSH_DEBOUNCE = 5
+
+# Read-only connections shared by all request threads
+_READ_POOL_SIZE = 4
+
+# Most messages a single writer transaction will commit together
+_WRITE_BATCH_SIZE = 256
+
+# Applied to every connection; journal_mode=WAL is set once in
+# _init_database because it persists in the database file
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-20000",
+    # Read pages straight from a 256 MB memory map instead of read() calls
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA foreign_keys=ON",
+)
+
+# SQL is kept constant so sqlite3's per-connection statement cache
+# reuses each prepared plan instead of re-parsing it on every call
+_SQL_INSERT_MESSAGE = """
+    INSERT INTO messages (repository_id, content, timestamp, author)
+    VALUES (?, ?, ?, ?)
+"""
+
+# Repository filters, keyed by min(number of ids, 2). A single id is
+# compared directly, so idx_messages_repo returns its rows already in
+# page order. Several ids are bound as one JSON array so the statement
+# text doesn't change with their number.
+_SQL_REPOSITORY_FILTER = {
+    1: "m.repository_id = ?",
+    2: "m.repository_id IN (SELECT value FROM json_each(?))",
+}
+
+_SQL_COUNT_MESSAGES = {
+    0: "SELECT COUNT(*) AS count FROM messages m",
+    **{
+        key: "SELECT COUNT(*) AS count FROM messages m WHERE " + clause
+        for key, clause in _SQL_REPOSITORY_FILTER.items()
+    },
+}
+
+def _repository_filter(repository_ids: Optional[Sequence[int]]) -> Tuple[int, Tuple[Any, ...]]:
+    """Pick the repository filter for some ids and return its key and parameters."""
+    if not repository_ids:
+        return 0, ()
+    if len(repository_ids) == 1:
+        return 1, (repository_ids[0],)
+    return 2, (json.dumps(list(repository_ids)),)
+
+def _select_messages_sql(sort_order: str, filtered: int, keyset: bool) -> str:
+    """Build one variant of the message page query."""
+    clauses = []
+    if filtered:
+        clauses.append(_SQL_REPOSITORY_FILTER[filtered])
+    if keyset:
+        # Keyset pagination seeks straight to the cursor instead
+        # of walking and discarding every row before an OFFSET
+        clauses.append("(m.timestamp, m.id) {} (?, ?)".format('<' if sort_order == 'DESC' else '>'))
+    where = " WHERE " + " AND ".join(clauses) if clauses else ""
+    return """
+        SELECT m.id, m.content, m.timestamp, m.author, r.name
+        FROM messages m
+        JOIN repositories r ON m.repository_id = r.id{}
+        ORDER BY m.timestamp {sort}, m.id {sort}
+        LIMIT ? OFFSET ?
+    """.format(where, sort=sort_order)
+
+# Every (sort_order, filtered, keyset) combination, built once
+_SQL_SELECT_MESSAGES = {
+    (sort_order, filtered, keyset): _select_messages_sql(sort_order, filtered, keyset)
+    for sort_order in ('ASC', 'DESC')
+    for filtered in (0, 1, 2)
+    for keyset in (False, True)
+}
+
+# JSON bodies smaller than this are sent uncompressed; gzip's own
+# header and trailer would outweigh the savings
+_GZIP_MIN_SIZE = 1024
+
+# Seconds an idle keep-alive connection may wait for its next request
+KEEP_ALIVE_TIMEOUT = 15
+
+# Largest POST body read into memory; chat messages are far smaller
+MAX_REQUEST_BODY_SIZE = 64 * 1024
+
+# Most encoded GET responses kept for the current database version
+_RESPONSE_CACHE_SIZE = 128
+
+# Static files larger than this are streamed from disk instead of cached
+_MAX_CACHED_FILE_SIZE = 256 * 1024
+
+# created_at default: the current time in microseconds since the epoch
+_SQL_NOW_US = "CAST(strftime('%s', 'now') AS INTEGER) * 1000000"
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+def _parse_timestamp(text: str) -> int:
+    """
+    Convert an ISO 8601 timestamp to integer microseconds since the epoch.
+    
+    Timestamps without a UTC offset are taken to be UTC.
+    
+    Raises:
+        ValueError: If text isn't an ISO 8601 timestamp
+    """
+    parsed = datetime.fromisoformat(text)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return (parsed - _EPOCH) // timedelta(microseconds=1)
+
+def _format_timestamp(microseconds: int) -> str:
+    """Format integer microseconds since the epoch as an ISO 8601 UTC timestamp."""
+    return (_EPOCH + timedelta(microseconds=microseconds)).isoformat()
+
+def _json_dumps(data: Any) -> bytes:
+    """
+    Encode data as compact UTF-8 JSON.
+    
+    Uses orjson when it is installed; the json fallback is configured
+    to produce the same bytes.
+    """
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def _json_loads(body: bytes) -> Any:
+    """
+    Decode a UTF-8 JSON request body.
+    
+    Uses orjson when it is installed. Malformed JSON raises
+    json.JSONDecodeError (orjson's error subclasses it); bytes that aren't
+    UTF-8 raise UnicodeDecodeError from the fallback, or the same
+    JSONDecodeError from orjson.
+    """
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body.decode('utf-8'))
+
+def _content_type(filepath: str) -> str:
+    """Look up the content type for a file from its extension."""
+    dot = filepath.rfind('.')
+    # A dot before the last path separator belongs to a directory name
+    if dot <= filepath.rfind(os.sep):
+        return 'application/octet-stream'
+    return _CONTENT_TYPES.get(filepath[dot:], 'application/octet-stream')
+
+def _resolve_static_path(path: str, root: str = 'static') -> Optional[str]:
+    """
+    Map a request path onto a file inside the static directory.
+    
+    Args:
+        path: Request path relative to the static directory
+        root: Static directory
+        
+    Returns:
+        The absolute file path, or None if the path escapes the static directory
+    """
+    root = os.path.realpath(root)
+    filepath = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, filepath]) != root:
+        return None
+    return filepath
+
+@functools.lru_cache(maxsize=64)
+def _load_static_file(filepath: str) -> Tuple[Optional[bytes], str, Optional[str]]:
+    """
+    Read a static file once and remember its body, content type and ETag.
+    
+    Static files don't change while the server is running, so repeated
+    requests are served from memory instead of the disk. Files larger than
+    _MAX_CACHED_FILE_SIZE are not kept in memory and come back with a body
+    and ETag of None. Callers must resolve filepath with _resolve_static_path first.
+    """
+    content_type = _content_type(filepath)
+    with open(filepath, 'rb') as f:
+        if os.fstat(f.fileno()).st_size > _MAX_CACHED_FILE_SIZE:
+            return None, content_type, None
+        content = f.read()
+    etag = '"{}"'.format(hashlib.blake2b(content, digest_size=8).hexdigest())
+    return content, content_type, etag
+
+def preload_static_files(roots: Sequence[str] = ('templates', 'static')) -> None:
+    """Fill the static file cache so first requests don't touch the disk."""
+    for root in roots:
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                _load_static_file(os.path.realpath(os.path.join(dirpath, filename)))
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag using weak comparison."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == '*' or candidate == etag:
+            return True
+    return False
+
+@functools.lru_cache(maxsize=_RESPONSE_CACHE_SIZE)
+def _json_etag(body: bytes) -> str:
+    """Hash an encoded JSON body into an entity tag, once per cached body."""
+    return '"{}"'.format(hashlib.blake2b(body, digest_size=8).hexdigest())
+
+@functools.lru_cache(maxsize=_RESPONSE_CACHE_SIZE)
+def _gzip_json(body: bytes) -> bytes:
+    """
+    Gzip an encoded JSON body, remembering the result.
+    
+    Bodies come from the response caches, so a client polling an unchanged
+    page gets the same bytes object back and skips compression as well as
+    encoding. The bytes hash its contents only once and keep the result.
+    """
+    # Level 1 gets most of the size reduction for very little CPU
+    return gzip.compress(body, compresslevel=1)
+
 class DatabaseManager:
     def __init__(self, db_path: str = "database/messages.db"):
         self.db_path = db_path
-        print(f"Initializing DatabaseManager with path: {db_path}")
+        logger.debug("Initializing DatabaseManager with path: %s", db_path)
         self._init_database()
+        # Reads check out one of a few pooled read-only connections and
+        # never wait on writers; writes share a single connection
+        # serialized by the lock
+        self._read_pool: queue.LifoQueue = queue.LifoQueue()
+        for _ in range(_READ_POOL_SIZE):
+            self._read_pool.put(self.get_connection(
+                read_only=True, check_same_thread=False, isolation_level=None
+            ))
+        self.lock = threading.Lock()
+        # Bumped after every committed write so readers can tell
+        # whether cached results are still current
+        self.version = 0
+        # Bumped only when repositories change, so new messages don't
+        # invalidate the cached repository list
+        self.repositories_version = 0
+        self._write_conn = self.get_connection(check_same_thread=False)
+        # New messages are inserted by one writer thread that commits
+        # whatever has queued up in a single transaction
+        self._write_q: queue.Queue = queue.Queue()
+        self._last_timestamp = 0
+        self._writer = threading.Thread(target=self._write_loop, name="db-writer", daemon=True)
+        self._writer.start()
         self.github_enabled = False
         if os.getenv('GITHUB_TOKEN'):
             try:
                 self.github = GitHubManager()
                 self.github_enabled = True
-                print("GitHub integration enabled")
+                logger.info("GitHub integration enabled")
             except Exception as e:
-                print(f"GitHub integration disabled: {str(e)}")
+                logger.warning("GitHub integration disabled: %s", e)
+        
+        # Writes only set the event; a background thread runs the git
+        # pipeline at most once per debounce window
+        self._push_event = threading.Event()
+        self._push_lock = threading.Lock()
+        # Outcome of the most recent push, reported by GET /push/status
+        self.last_push: Optional[Dict[str, Any]] = None
+        if self.github_enabled:
+            threading.Thread(target=self._push_loop, name="github-push", daemon=True).start()
         
     def _init_database(self) -> None:
         """Initialize the database with the schema."""
         try:
             os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
             with self.get_connection() as conn:
+                # WAL lets readers proceed while a write commits and turns
+                # each commit into an append instead of a journal fsync
+                conn.execute("PRAGMA journal_mode=WAL")
                 conn.execute("""
                     CREATE TABLE IF NOT EXISTS repositories (
                         id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -51,12 +351,23 @@ class DatabaseManager:
                         id INTEGER PRIMARY KEY AUTOINCREMENT,
                         repository_id INTEGER DEFAULT 1,
                         content TEXT NOT NULL,
-                        timestamp TEXT NOT NULL,
+                        timestamp INTEGER NOT NULL,
                         author TEXT,
                         git_commit_hash TEXT,
-                        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                        created_at INTEGER DEFAULT ({}),
                         FOREIGN KEY (repository_id) REFERENCES repositories(id)
                     )
+                """.format(_SQL_NOW_US))
+                self._migrate_timestamps(conn)
+                # Serves keyset pagination as an index range scan
+                conn.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_messages_timestamp_id
+                    ON messages (timestamp, id)
+                """)
+                # Serves repository filters, both for counts and ordered pages
+                conn.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_messages_repo
+                    ON messages (repository_id, timestamp, id)
                 """)
                 
                 # Add default repository if it doesn't exist
@@ -64,222 +375,555 @@ class DatabaseManager:
                     INSERT OR IGNORE INTO repositories (id, name, url) 
                     VALUES (1, 'default', 'default')
                 """)
-                conn.commit()
-                print("Database initialized successfully")
+                logger.info("Database initialized successfully")
         except Exception as e:
-            print(f"Error initializing database: {str(e)}")
+            logger.error("Error initializing database: %s", e)
             raise
 
-    def get_connection(self):
-        """Get a database connection."""
+    def _migrate_timestamps(self, conn: sqlite3.Connection) -> None:
+        """
+        Convert a messages table with ISO text timestamps to integer microseconds.
+        
+        SQLite can't change a column's type in place, so the table is rebuilt
+        from its own CREATE statement with the two column types swapped, which
+        keeps any extra columns and indexes an older database has.
+        """
+        conn.execute("BEGIN IMMEDIATE")
+        table_sql = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'messages'"
+        ).fetchone()['sql']
+        new_sql, count = re.subn(r'\btimestamp\s+TEXT\b', 'timestamp INTEGER', table_sql, flags=re.I)
+        if not count:
+            conn.execute("COMMIT")
+            return
+        
+        logger.info("Migrating message timestamps to integer microseconds...")
+        new_sql = re.sub(
+            r'\bcreated_at\s+TEXT\s+DEFAULT\s+CURRENT_TIMESTAMP',
+            'created_at INTEGER DEFAULT ({})'.format(_SQL_NOW_US),
+            new_sql, flags=re.I
+        )
+        new_sql = re.sub(
+            r'^\s*CREATE\s+TABLE\s+(IF\s+NOT\s+EXISTS\s+)?messages\b',
+            'CREATE TABLE messages_migrated',
+            new_sql, count=1, flags=re.I
+        )
+        columns = [row['name'] for row in conn.execute("PRAGMA table_info(messages)")]
+        index_sql = [
+            row['sql'] for row in conn.execute(
+                "SELECT sql FROM sqlite_master"
+                " WHERE type = 'index' AND tbl_name = 'messages' AND sql IS NOT NULL"
+            )
+        ]
+        converted = {
+            name: _parse_timestamp for name in ('timestamp', 'created_at') if name in columns
+        }
+        rows = [
+            tuple(
+                converted[name](value) if name in converted and isinstance(value, str) else value
+                for name, value in zip(columns, row)
+            )
+            for row in conn.execute("SELECT {} FROM messages".format(','.join(columns)))
+        ]
+        
+        # Keep AUTOINCREMENT from reusing ids of messages deleted before the rebuild
+        sequence = conn.execute(
+            "SELECT seq FROM sqlite_sequence WHERE name = 'messages'"
+        ).fetchone()
+        
+        conn.execute(new_sql)
+        conn.executemany(
+            "INSERT INTO messages_migrated ({}) VALUES ({})".format(
+                ','.join(columns), ','.join('?' * len(columns))
+            ),
+            rows
+        )
+        conn.execute("DROP TABLE messages")
+        conn.execute("ALTER TABLE messages_migrated RENAME TO messages")
+        if sequence is not None:
+            conn.execute(
+                "UPDATE sqlite_sequence SET seq = max(seq, ?) WHERE name = 'messages'",
+                (sequence['seq'],)
+            )
+        for sql in index_sql:
+            conn.execute(sql)
+        conn.execute("COMMIT")
+        logger.info("Migrated %d messages", len(rows))
+
+    def get_connection(self, read_only: bool = False, **kwargs: Any) -> sqlite3.Connection:
+        """Open a new database connection, optionally one that can't write."""
         try:
-            conn = sqlite3.connect(self.db_path)
+            kwargs.setdefault('cached_statements', 256)
+            database = self.db_path
+            if read_only:
+                database = 'file:{}?mode=ro'.format(urllib.parse.quote(os.path.abspath(self.db_path)))
+                kwargs['uri'] = True
+            conn = sqlite3.connect(database, **kwargs)
             conn.row_factory = sqlite3.Row
+            for pragma in _CONNECTION_PRAGMAS:
+                conn.execute(pragma)
             return conn
         except Exception as e:
-            print(f"Error connecting to database: {str(e)}")
-            print(f"Traceback: {traceback.format_exc()}")
+            logger.exception("Error connecting to database: %s", e)
             raise
 
-    def add_repository(self, name: str, url: str) -> int:
-        """Add a new repository to track."""
+    @contextlib.contextmanager
+    def read_connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow a pooled read-only connection for the duration of the block.
+        
+        The connections are in autocommit mode, so each query reads the
+        latest committed data. Blocks while every connection is in use.
+        """
+        conn = self._read_pool.get()
         try:
-            with self.get_connection() as conn:
-                cursor = conn.execute(
-                    "INSERT OR IGNORE INTO repositories (name, url) VALUES (?, ?)",
-                    (name, url)
-                )
-                conn.commit()
-                
-                if cursor.rowcount == 0:
-                    cursor = conn.execute(
-                        "SELECT id FROM repositories WHERE url = ?",
-                        (url,)
-                    )
-                    row = cursor.fetchone()
-                    return row['id']
-                return cursor.lastrowid
-        except Exception as e:
-            print(f"Error in add_repository: {str(e)}")
-            print(f"Traceback: {traceback.format_exc()}")
-            raise
+            yield conn
+        finally:
+            self._read_pool.put(conn)
 
-    def save_message(self, content: str, timestamp: str, author: str, repository_id: int = 1) -> bool:
-        """Save a new message to the database and optionally push to GitHub."""
-        try:
-            with self.get_connection() as conn:
-                cursor = conn.execute(
-                    """
-                    INSERT INTO messages (repository_id, content, timestamp, author)
-                    VALUES (?, ?, ?, ?)
-                    """,
-                    (repository_id, content, timestamp, author)
-                )
-                conn.commit()
+    def close(self) -> None:
+        """Flush queued messages and close every connection."""
+        self._write_q.put(None)
+        self._writer.join()
+        with self.lock:
+            self._write_conn.close()
+        for _ in range(_READ_POOL_SIZE):
+            self._read_pool.get().close()
 
-            # Only try to push to GitHub if it's enabled and configured
-            if self.github_enabled and hasattr(self, 'github'):
+    def _write_loop(self) -> None:
+        """Insert queued messages in batches until close() sends None."""
+        while True:
+            batch = [self._write_q.get()]
+            while len(batch) < _WRITE_BATCH_SIZE:
                 try:
-                    self.push_to_github()
-                except Exception as e:
-                    print(f"Warning: Failed to push to GitHub: {str(e)}")
-                    # Continue anyway - the message is saved in the database
+                    batch.append(self._write_q.get_nowait())
+                except queue.Empty:
+                    break
             
-            return True
-        except Exception as e:
-            print(f"Error saving message: {str(e)}")
-            raise
+            pending = [item for item in batch if item is not None]
+            if pending:
+                self._insert_messages(pending)
+            if len(pending) < len(batch):
+                return
 
-    def push_to_github(self):
-        """Push messages.db to GitHub if enabled."""
-        if not (self.github_enabled and hasattr(self, 'github')):
-            print("GitHub integration is disabled - skipping push")
-            return
-            
+    def _insert_messages(self, pending: List[Tuple[Tuple[Any, ...], Future]]) -> None:
+        """Insert a batch of messages in one transaction and resolve their futures."""
+        # Messages saved without a timestamp share one taken per batch; the
+        # writer is the only thread here, so timestamps never go backwards
+        # relative to ids, which keyset cursors depend on
+        timestamp = max(time.time_ns() // 1000, self._last_timestamp)
+        self._last_timestamp = timestamp
         try:
-            repo_root = os.path.dirname(os.path.abspath(__file__))
-            print(f"Repository root: {repo_root}")
-            
-            # Add messages.db to git
-            result = subprocess.run(
-                ['git', 'add', 'database/messages.db'],
-                check=False,  # Don't raise exception on error
-                cwd=repo_root,
-                capture_output=True,
-                text=True
-            )
-            if result.returncode != 0:
-                print(f"Warning: git add failed: {result.stderr}")
+            with self.lock:
+                with self._write_conn as conn:
+                    # One execute per row rather than executemany, so each
+                    # caller gets its own lastrowid back
+                    ids = [
+                        conn.execute(
+                            _SQL_INSERT_MESSAGE,
+                            (repository_id, content,
+                             timestamp if row_timestamp is None else row_timestamp, author)
+                        ).lastrowid
+                        for (repository_id, content, row_timestamp, author), _ in pending
+                    ]
+                self.version += 1
+        except Exception as e:
+            if len(pending) > 1:
+                # Retry one by one so a bad row fails only its own request
+                for item in pending:
+                    self._insert_messages([item])
                 return
+            pending[0][1].set_exception(e)
+            return
+        for (_, future), message_id in zip(pending, ids):
+            future.set_result(message_id)
 
-            # Create a commit with timestamp
-            current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            commit_message = f'Update messages - {current_time}'
-            
-            result = subprocess.run(
-                ['git', 'commit', '-m', commit_message],
-                check=False,  # Don't raise exception on error
-                cwd=repo_root,
-                capture_output=True,
-                text=True
+    def _upsert_repository(self, conn: sqlite3.Connection, name: str, url: str) -> int:
+        """Insert a repository if it is new and return its id."""
+        if _SQLITE_HAS_RETURNING:
+            # The no-op update makes RETURNING yield the existing id
+            # on conflict, so no follow-up SELECT is needed
+            cursor = conn.execute(
+                """
+                INSERT INTO repositories (name, url) VALUES (?, ?)
+                ON CONFLICT(url) DO UPDATE SET name = name
+                RETURNING id
+                """,
+                (name, url)
             )
-            if result.returncode != 0:
-                print(f"Warning: git commit failed: {result.stderr}")
-                return
+            return cursor.fetchone()['id']
 
-            # Push to remote
-            result = subprocess.run(
-                ['git', 'push', 'origin', 'main'],
-                check=False,  # Don't raise exception on error
-                cwd=repo_root,
-                capture_output=True,
-                text=True
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO repositories (name, url) VALUES (?, ?)",
+            (name, url)
+        )
+        if cursor.rowcount == 0:
+            cursor = conn.execute(
+                "SELECT id FROM repositories WHERE url = ?",
+                (url,)
             )
-            if result.returncode != 0:
-                print(f"Warning: git push failed: {result.stderr}")
-                return
+            row = cursor.fetchone()
+            return row['id']
+        return cursor.lastrowid
+
+    def add_repository(self, name: str, url: str) -> int:
+        """Add a new repository to track."""
+        try:
+            with self.lock:
+                with self._write_conn as conn:
+                    repo_id = self._upsert_repository(conn, name, url)
+                self.version += 1
+                self.repositories_version += 1
+                return repo_id
+        except Exception as e:
+            logger.exception("Error in add_repository: %s", e)
+            raise
+
+    def save_message(self, content: str, timestamp: Optional[str], author: str,
+                     repository_id: int = 1) -> int:
+        """
+        Save a new message to the database and optionally push to GitHub.
+        
+        Args:
+            timestamp: ISO 8601 timestamp, or None to stamp the message
+                with the time its batch is committed
+        
+        Returns:
+            The id of the new message
+        """
+        try:
+            stored_timestamp = None if timestamp is None else _parse_timestamp(timestamp)
+            # Waits only until the writer thread commits the batch holding this message
+            future: Future = Future()
+            self._write_q.put(((repository_id, content, stored_timestamp, author), future))
+            message_id = future.result()
 
+            self.schedule_push()
+            return message_id
         except Exception as e:
-            print(f"Warning: Error during GitHub push: {str(e)}")
-            # Continue anyway - the message is saved in the database
+            logger.error("Error saving message: %s", e)
+            raise
+
+    def schedule_push(self) -> bool:
+        """
+        Schedule a GitHub push, if the integration is configured.
+        
+        Requests made while a push is already pending join that push.
+        
+        Returns:
+            True if a push was scheduled
+        """
+        # Only try to push to GitHub if it's enabled and configured
+        if self.github_enabled and hasattr(self, 'github'):
+            self._push_event.set()
+            return True
+        return False
+
+    def push_status(self) -> Dict[str, Any]:
+        """Report whether a push is scheduled or running, and how the last one went."""
+        return {
+            'enabled': self.github_enabled,
+            'pending': self._push_event.is_set(),
+            'running': self._push_lock.locked(),
+            'last_push': self.last_push
+        }
+
+    def _push_loop(self) -> None:
+        """Push once per burst of writes, off the request threads."""
+        # Connect to the API here rather than in __init__ so startup never
+        # waits on the network
+        self.github.warm_up()
+        while True:
+            self._push_event.wait()
+            time.sleep(_PUSH_DEBOUNCE)
+            # Cleared after the sleep so writes during it join this push;
+            # writes during the push itself schedule the next one
+            self._push_event.clear()
+            try:
+                pushed = self.push_to_github()
+            except Exception as e:
+                logger.warning("Failed to push to GitHub: %s", e)
+                # Continue anyway - the message is saved in the database
+                pushed = False
+            self.last_push = {
+                'status': 'success' if pushed else 'failed',
+                'finished_at': _format_timestamp(time.time_ns() // 1000)
+            }
+
+    def push_to_github(self) -> bool:
+        """
+        Push messages.db to GitHub if enabled.
+        
+        Returns:
+            True if the database was committed and pushed
+        """
+        if not (self.github_enabled and hasattr(self, 'github')):
+            logger.debug("GitHub integration is disabled - skipping push")
+            return False
+        
+        # Only one git pipeline may run at a time
+        with self._push_lock:
+            try:
+                repo_root = os.path.dirname(os.path.abspath(__file__))
+                logger.debug("Repository root: %s", repo_root)
+                
+                # Fold the WAL back into messages.db so the committed file
+                # contains every saved message
+                with self.lock:
+                    self._write_conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                
+                # Create a commit with timestamp; naming the tracked file as
+                # a pathspec stages and commits it in one git process
+                current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                commit_message = f'Update messages - {current_time}'
+                
+                result = subprocess.run(
+                    ['git', 'commit', '-m', commit_message, '--', 'database/messages.db'],
+                    check=False,  # Don't raise exception on error
+                    cwd=repo_root,
+                    capture_output=True,
+                    text=True
+                )
+                if result.returncode != 0:
+                    logger.warning("git commit failed: %s", result.stderr)
+                    return False
+
+                # Push to remote
+                result = subprocess.run(
+                    ['git', 'push', 'origin', 'main'],
+                    check=False,  # Don't raise exception on error
+                    cwd=repo_root,
+                    capture_output=True,
+                    text=True
+                )
+                if result.returncode != 0:
+                    logger.warning("git push failed: %s", result.stderr)
+                    return False
+                return True
+
+            except Exception as e:
+                logger.warning("Error during GitHub push: %s", e)
+                # Continue anyway - the message is saved in the database
+                return False
 
     def get_repositories(self, active_only: bool = True) -> List[Dict]:
         """Get list of tracked repositories."""
-        with self.get_connection() as conn:
-            query = "SELECT * FROM repositories"
-            if active_only:
-                query += " WHERE is_active = TRUE"
-            cursor = conn.execute(query)
-            return [dict(row) for row in cursor.fetchall()]
+        query = "SELECT id, name, url, last_synced, is_active, created_at FROM repositories"
+        if active_only:
+            query += " WHERE is_active = TRUE"
+        with self.read_connection() as conn:
+            # Zip plain tuples with the column names read once from the
+            # cursor, instead of converting a sqlite3.Row per repository
+            rows = conn.cursor()
+            rows.row_factory = None
+            rows.execute(query)
+            keys = [column[0] for column in rows.description]
+            return [dict(zip(keys, row)) for row in rows]
+        
+    def iter_messages(self, limit: Optional[int] = None, offset: int = 0,
+                      sort_order: str = "DESC",
+                      repository_ids: Optional[Sequence[int]] = None,
+                      cursor: Optional[Tuple[int, int]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield messages one at a time as SQLite steps through the result.
+        
+        Args:
+            cursor: (timestamp in microseconds, id) of the last message on the
+                previous page; only messages strictly after it in sort order
+                are returned
+        """
+        filtered, filter_params = _repository_filter(repository_ids)
+        query = _SQL_SELECT_MESSAGES.get((sort_order, filtered, cursor is not None))
+        if query is None:
+            raise ValueError(f"Invalid sort order: {sort_order}")
+        params: List[Any] = list(filter_params)
+        if cursor is not None:
+            params.extend(cursor)
+        # A negative LIMIT means no limit in SQLite
+        params.extend((-1 if limit is None else limit, offset))
         
+        # The connection goes back to the pool once the generator is
+        # exhausted or closed
+        with self.read_connection() as conn:
+            # Plain tuples unpack by position, skipping sqlite3.Row's name lookups
+            rows = conn.cursor()
+            rows.row_factory = None
+            for message_id, content, timestamp, author, repository in rows.execute(query, params):
+                yield {
+                    'id': message_id,
+                    'content': content,
+                    # Stored as integer microseconds; only returned rows are formatted
+                    'timestamp': _format_timestamp(timestamp),
+                    'author': author,
+                    'repository': repository
+                }
+
     def get_messages(self, limit: Optional[int] = None, offset: int = 0,
-                    sort_order: str = "DESC") -> List[Dict[str, Any]]:
-        """Get messages from the database."""
+                    sort_order: str = "DESC",
+                    repository_ids: Optional[Sequence[int]] = None,
+                    cursor: Optional[Tuple[int, int]] = None) -> List[Dict[str, Any]]:
+        """Get messages from the database with optional filtering."""
         try:
-            with self.get_connection() as conn:
-                query = """
-                    SELECT m.*, r.name as repository_name 
-                    FROM messages m
-                    JOIN repositories r ON m.repository_id = r.id
-                    ORDER BY m.created_at {}
-                """.format(sort_order)
-                
-                if limit is not None:
-                    query += f" LIMIT {limit}"
-                if offset:
-                    query += f" OFFSET {offset}"
-                
-                cursor = conn.execute(query)
-                messages = []
-                for row in cursor:
-                    messages.append({
-                        'id': row['id'],
-                        'content': row['content'],
-                        'timestamp': row['timestamp'],
-                        'author': row['author'],
-                        'repository': row['repository_name']
-                    })
-                return messages
+            return list(self.iter_messages(limit, offset, sort_order, repository_ids, cursor))
         except Exception as e:
-            print(f"Error getting messages: {str(e)}")
+            logger.error("Error getting messages: %s", e)
             raise
 
-    def get_message_count(self, repository_ids: Optional[List[int]] = None,
-                         message_types: Optional[List[str]] = None) -> int:
+    def get_message_count(self, repository_ids: Optional[Sequence[int]] = None) -> int:
         """Get total number of messages with optional filtering."""
-        with self.get_connection() as conn:
-            query = "SELECT COUNT(*) as count FROM messages WHERE 1=1"
-            params = []
-            
-            if repository_ids:
-                query += " AND repository_id IN ({})".format(
-                    ','.join('?' * len(repository_ids))
-                )
-                params.extend(repository_ids)
-            
-            if message_types:
-                query += " AND message_type IN ({})".format(
-                    ','.join('?' * len(message_types))
-                )
-                params.extend(message_types)
-            
-            cursor = conn.execute(query, params)
-            return cursor.fetchone()['count']
+        filtered, params = _repository_filter(repository_ids)
+        with self.read_connection() as conn:
+            return conn.execute(_SQL_COUNT_MESSAGES[filtered], params).fetchone()['count']
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """
+    Check whether an Accept-Encoding header value allows gzip.
+    
+    An explicit gzip entry wins over the * wildcard, and a q-value of 0
+    means the coding is refused.
+    
+    Args:
+        accept_encoding: Raw Accept-Encoding header value
+        
+    Returns:
+        True if a gzip-encoded response is acceptable
+    """
+    qvalues = {}
+    for coding in accept_encoding.split(','):
+        name, _, params = coding.partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qvalues[name] = q
+    if 'gzip' in qvalues:
+        return qvalues['gzip'] > 0
+    return qvalues.get('*', 0) > 0
+
+def parse_message_query(query: str) -> Dict[str, Any]:
+    """
+    Parse and validate the query string of a GET /messages request.
+    
+    Args:
+        query: Raw query string, e.g. "limit=20&offset=0&sort=DESC&repositories=1,2"
+        
+    Returns:
+        Dict with limit, offset, sort_order, repository_ids (a tuple or None)
+        and cursor (a (timestamp, id) tuple from before_ts/before_id or
+        after_ts/after_id, or None)
+        
+    Raises:
+        ValueError: If a parameter is malformed or out of range
+    """
+    # parse_qsl yields flat (key, value) pairs; a repeated key keeps its last value
+    raw = dict(urllib.parse.parse_qsl(query))
+    
+    try:
+        limit = int(raw.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if not 0 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 0 and {MAX_PAGE_SIZE}")
+    
+    try:
+        offset = int(raw.get('offset', 0))
+    except ValueError:
+        raise ValueError("offset must be an integer")
+    if offset < 0:
+        raise ValueError("offset must not be negative")
+    
+    # Unknown sort orders fall back to newest first
+    sort_order = raw.get('sort', 'DESC').upper()
+    if sort_order not in ('ASC', 'DESC'):
+        sort_order = 'DESC'
+    
+    repository_ids = None
+    if raw.get('repositories'):
+        try:
+            repository_ids = tuple(map(int, raw['repositories'].split(',')))
+        except ValueError:
+            raise ValueError("repositories must be a comma-separated list of ids")
+    
+    # Newest-first pages continue with before_*, oldest-first with after_*
+    cursor = None
+    for prefix, direction in (('before', 'DESC'), ('after', 'ASC')):
+        cursor_ts = raw.get(f'{prefix}_ts')
+        cursor_id = raw.get(f'{prefix}_id')
+        if cursor_ts is None and cursor_id is None:
+            continue
+        if cursor_ts is None or cursor_id is None:
+            raise ValueError(f"{prefix}_ts and {prefix}_id must be given together")
+        if sort_order != direction:
+            raise ValueError(f"{prefix}_ts/{prefix}_id require sort={direction}")
+        try:
+            cursor = (_parse_timestamp(cursor_ts), int(cursor_id))
+        except ValueError:
+            raise ValueError(f"{prefix}_ts must be an ISO 8601 timestamp and {prefix}_id an integer")
+    if cursor is not None and offset:
+        raise ValueError("offset cannot be combined with a cursor")
+    
+    return {
+        'limit': limit,
+        'offset': offset,
+        'sort_order': sort_order,
+        'repository_ids': repository_ids,
+        'cursor': cursor
+    }
 
 class MessageHandler(http.server.SimpleHTTPRequestHandler):
     """Custom HTTP request handler for the messaging application."""
     
-    # Class-level database manager to be shared across all requests
-    db_manager = None
+    # Keep connections open between requests so polling clients
+    # don't pay a new TCP handshake every time
+    protocol_version = "HTTP/1.1"
+    timeout = KEEP_ALIVE_TIMEOUT
+    # Buffer writes so a response's headers and body leave in one send()
+    # instead of one per write; handle_one_request flushes after each request
+    wbufsize = -1
+    # Set TCP_NODELAY so a response split across sends (headers, then a
+    # sendfile body) isn't held back by Nagle waiting on a delayed ACK
+    disable_nagle_algorithm = True
     
-    def __init__(self, *args, **kwargs):
-        if MessageHandler.db_manager is None:
-            MessageHandler.db_manager = DatabaseManager()
-        super().__init__(*args, **kwargs)
+    # Database manager shared by every request; run_server creates it
+    # once before the first connection is accepted
+    db_manager: Optional[DatabaseManager] = None
+    
+    # Encoded GET responses, valid until the database version changes
+    _response_cache: Dict[Tuple[Any, ...], bytes] = {}
+    _response_cache_generation: Optional[Tuple[Any, int]] = None
+    _response_cache_lock = threading.Lock()
+    # ((db_manager, repositories_version), body) for GET /repositories
+    _repositories_cache: Optional[Tuple[Tuple[Any, int], bytes]] = None
 
     def do_GET(self) -> None:
         """Handle GET requests."""
         try:
-            if self.path.startswith('/messages'):
-                messages = MessageHandler.db_manager.get_messages(limit=50)
-                self.send_json_response(messages)
-                return
-                
             parsed_path = urllib.parse.urlparse(self.path)
-            query_params = urllib.parse.parse_qs(parsed_path.query)
             
-            if parsed_path.path == '/':
+            if parsed_path.path == '/messages':
+                self.handle_get_messages(parsed_path.query)
+                
+            elif parsed_path.path == '/':
                 # Serve the main page
-                print("Serving main page...")
-                self.serve_file('templates/index.html', 'text/html')
+                logger.debug("Serving main page...")
+                self.serve_cached_file(os.path.realpath('templates/index.html'))
+                
+            elif parsed_path.path == '/push/status':
+                self.send_json_response(self.db_manager.push_status())
                 
             elif parsed_path.path == '/repositories':
-                print("Handling /repositories request...")
+                logger.debug("Handling /repositories request...")
                 try:
-                    repositories = MessageHandler.db_manager.get_repositories()
-                    self.send_json_response({"repositories": repositories})
+                    self.send_cacheable_json(self.repositories_json())
                 except Exception as e:
-                    print(f"Error getting repositories: {str(e)}")
+                    logger.error("Error getting repositories: %s", e)
                     self.send_json_response(
                         {"error": "Failed to get repositories"}, 
                         HTTPStatus.INTERNAL_SERVER_ERROR
@@ -289,27 +933,136 @@ class MessageHandler(http.server.SimpleHTTPRequestHandler):
                 self.serve_static_file(parsed_path.path.lstrip('/'))
                 
         except Exception as e:
-            print(f"Error handling GET request: {str(e)}")
+            logger.error("Error handling GET request: %s", e)
             self.send_error(
                 HTTPStatus.INTERNAL_SERVER_ERROR,
                 "Internal server error"
             )
 
+    def handle_get_messages(self, query: str) -> None:
+        """Send a page of messages along with pagination details."""
+        try:
+            params = parse_message_query(query)
+        except ValueError as e:
+            self.send_json_response({"error": str(e)}, HTTPStatus.BAD_REQUEST)
+            return
+        
+        body = self.cached_json(
+            ('messages',) + tuple(params.items()),
+            lambda: self.encode_messages_page(params)
+        )
+        self.send_cacheable_json(body)
+
+    def encode_messages_page(self, params: Dict[str, Any]) -> bytes:
+        """
+        Query and encode one page of messages for parsed GET /messages parameters.
+        
+        Each row is encoded as soon as SQLite produces it, so the page is
+        never held as a list of dicts alongside its JSON.
+        """
+        # Fetch one extra row to learn whether another page follows
+        limit = params['limit']
+        rows = self.db_manager.iter_messages(**dict(params, limit=limit + 1))
+        encoded = []
+        last = None
+        has_more = False
+        for message in rows:
+            if len(encoded) == limit:
+                has_more = True
+                break
+            encoded.append(_json_dumps(message))
+            last = message
+        rows.close()
+        total = self.db_manager.get_message_count(params['repository_ids'])
+        
+        next_cursor = None
+        if has_more and last is not None:
+            prefix = 'before' if params['sort_order'] == 'DESC' else 'after'
+            next_cursor = {
+                f"{prefix}_ts": last['timestamp'],
+                f"{prefix}_id": last['id']
+            }
+        
+        pagination = _json_dumps({
+            "total": total,
+            "limit": limit,
+            "offset": params['offset'],
+            "has_more": has_more,
+            "next_cursor": next_cursor
+        })
+        # One join instead of chained +, which would copy the whole page
+        # once per concatenation
+        return b''.join((b'{"messages":[', b','.join(encoded), b'],"pagination":', pagination, b'}'))
+
+    def repositories_json(self) -> bytes:
+        """Return the encoded repository list, rebuilding it only after add_repository."""
+        generation = (self.db_manager, self.db_manager.repositories_version)
+        cached = MessageHandler._repositories_cache
+        if cached is not None and cached[0] == generation:
+            return cached[1]
+        body = _json_dumps({"repositories": self.db_manager.get_repositories()})
+        # A single tuple assignment, so readers never see a mismatched pair
+        MessageHandler._repositories_cache = (generation, body)
+        return body
+
+    def cached_json(self, key: Tuple[Any, ...], build: Callable[[], bytes]) -> bytes:
+        """
+        Return the encoded JSON for key, calling build only on a cache miss.
+        
+        Entries are dropped as soon as the database version changes, so
+        polling clients are served from memory until the next write.
+        """
+        cls = MessageHandler
+        # Read the version before querying: whatever build() sees is at
+        # least that new, so the entry can never be staler than its key
+        generation = (self.db_manager, self.db_manager.version)
+        with cls._response_cache_lock:
+            if cls._response_cache_generation != generation:
+                cls._response_cache.clear()
+                cls._response_cache_generation = generation
+            body = cls._response_cache.get(key)
+        if body is not None:
+            return body
+        
+        body = build()
+        with cls._response_cache_lock:
+            if cls._response_cache_generation == generation:
+                if len(cls._response_cache) >= _RESPONSE_CACHE_SIZE:
+                    # Evict the oldest entry
+                    del cls._response_cache[next(iter(cls._response_cache))]
+                cls._response_cache[key] = body
+        return body
+
     def do_POST(self) -> None:
         """Handle POST requests."""
         try:
             if self.path == '/messages':
                 # Parse request body
                 content_length = int(self.headers.get('Content-Length', 0))
-                if content_length == 0:
+                if content_length <= 0:
                     self.send_json_response(
                         {"error": "Empty request body"}, 
                         HTTPStatus.BAD_REQUEST
                     )
                     return
+                if content_length > MAX_REQUEST_BODY_SIZE:
+                    # The body is left unread, so the connection can't be reused
+                    self.close_connection = True
+                    self.send_json_response(
+                        {"error": "Request body too large"}, 
+                        HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+                    )
+                    return
 
                 body = self.rfile.read(content_length)
-                data = json.loads(body)
+                data = _json_loads(body)
+                
+                if not isinstance(data, dict):
+                    self.send_json_response(
+                        {"error": "Request body must be a JSON object"}, 
+                        HTTPStatus.BAD_REQUEST
+                    )
+                    return
                 
                 # Validate required fields
                 if 'content' not in data:
@@ -328,16 +1081,39 @@ class MessageHandler(http.server.SimpleHTTPRequestHandler):
                 
                 content = data['content']
                 author = data['author']
+                if not isinstance(content, str) or not isinstance(author, str):
+                    self.send_json_response(
+                        {"error": "Message content and author must be strings"}, 
+                        HTTPStatus.BAD_REQUEST
+                    )
+                    return
                 
-                # Save message with author
-                timestamp = datetime.now(timezone.utc).isoformat()
-                MessageHandler.db_manager.save_message(
+                # Save message with author; the writer thread stamps it
+                message_id = self.db_manager.save_message(
                     content=content,
-                    timestamp=timestamp,
+                    timestamp=None,
                     author=author
                 )
                 
-                self.send_json_response({'status': 'success'})
+                self.send_json_response({'status': 'success', 'id': message_id})
+                return
+            
+            if self.path == '/push':
+                if int(self.headers.get('Content-Length', 0)):
+                    # The endpoint takes no body; don't parse one left unread
+                    self.close_connection = True
+                # The git pipeline runs on the push thread; pushes requested
+                # while one is pending are folded into it
+                if not self.db_manager.schedule_push():
+                    self.send_json_response(
+                        {"status": "disabled", "message": "GitHub integration is disabled"},
+                        HTTPStatus.SERVICE_UNAVAILABLE
+                    )
+                    return
+                self.send_json_response(
+                    {"status": "accepted", "message": "Push scheduled"},
+                    HTTPStatus.ACCEPTED
+                )
                 return
                 
             self.send_error(
@@ -345,13 +1121,13 @@ class MessageHandler(http.server.SimpleHTTPRequestHandler):
                 "Endpoint not found"
             )
             
-        except json.JSONDecodeError:
+        except (json.JSONDecodeError, UnicodeDecodeError):
             self.send_json_response(
                 {"error": "Invalid JSON"}, 
                 HTTPStatus.BAD_REQUEST
             )
         except Exception as e:
-            print(f"Error handling POST request: {str(e)}")
+            logger.error("Error handling POST request: %s", e)
             self.send_error(
                 HTTPStatus.INTERNAL_SERVER_ERROR,
                 "Internal server error"
@@ -360,47 +1136,172 @@ class MessageHandler(http.server.SimpleHTTPRequestHandler):
     def serve_file(self, filepath: str, content_type: str) -> None:
         """Serve a file with the specified content type."""
         try:
-            with open(filepath, 'rb') as f:
-                content = f.read()
+            f = open(filepath, 'rb')
+        except FileNotFoundError:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return
+        with f:
+            size = os.fstat(f.fileno()).st_size
             self.send_response(HTTPStatus.OK)
             self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', size)
             self.end_headers()
-            self.wfile.write(content)
-        except FileNotFoundError:
-            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            self.copy_file(f, size)
+
+    def copy_file(self, f, size: int) -> None:
+        """
+        Copy an open file to the client.
+        
+        socket.sendfile() uses os.sendfile() where available, so the kernel
+        moves the data straight from the page cache to the socket, and falls
+        back to plain sends elsewhere or when the socket has a timeout.
+        """
+        # Headers are still in the write buffer; they must go out first
+        self.wfile.flush()
+        sent = self.connection.sendfile(f, 0, size)
+        if sent < size:
+            # The file shrank after Content-Length went out, so the response
+            # is short; drop the connection rather than desync keep-alive
+            logger.warning("Sent %d of %d bytes for %s", sent, size, f.name)
+            self.close_connection = True
 
     def serve_static_file(self, filepath: str) -> None:
         """Serve static files with appropriate content types."""
-        content_types = {
-            '.css': 'text/css',
-            '.js': 'application/javascript',
-            '.html': 'text/html',
-            '.png': 'image/png',
-            '.jpg': 'image/jpeg',
-            '.gif': 'image/gif'
-        }
-        
-        _, ext = os.path.splitext(filepath)
-        content_type = content_types.get(ext, 'application/octet-stream')
-        self.serve_file(os.path.join('static', filepath), content_type)
+        filepath = _resolve_static_path(filepath)
+        if filepath is None:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return
+        self.serve_cached_file(filepath)
+
+    def serve_cached_file(self, filepath: str) -> None:
+        """Serve a resolved file from the in-memory cache, answering 304 when unchanged."""
+        try:
+            content, content_type, etag = _load_static_file(filepath)
+        except (FileNotFoundError, IsADirectoryError):
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return
+        if content is None:
+            # Too large to keep in memory - stream it from disk
+            self.serve_file(filepath, content_type)
+            return
+        if _etag_matches(self.headers.get('If-None-Match'), etag):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', len(content))
+        self.send_header('ETag', etag)
+        # Revalidate on every use; unchanged files cost only a 304
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Log requests through the logging queue instead of writing to stderr."""
+        # Escape control characters from the request line like the base class
+        message = (format % args).translate(_CONTROL_CHAR_TABLE)
+        logger.info("%s - %s", self.address_string(), message)
+
+    def log_error(self, format: str, *args: Any) -> None:
+        """Log server errors at ERROR level."""
+        message = (format % args).translate(_CONTROL_CHAR_TABLE)
+        logger.error("%s - %s", self.address_string(), message)
+
+    def accepts_gzip(self) -> bool:
+        """Check whether the client accepts gzip-encoded responses."""
+        return accepts_gzip(self.headers.get('Accept-Encoding', ''))
 
     def send_json_response(self, data: Dict[str, Any], status: int = HTTPStatus.OK) -> None:
         """Send a JSON response with the specified data and status code."""
         try:
-            response = json.dumps(data).encode('utf-8')
-            self.send_response(status)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Content-Length', len(response))
-            self.send_header('Access-Control-Allow-Origin', '*')  # Allow CORS
-            self.end_headers()
-            self.wfile.write(response)
+            self.send_json_body(_json_dumps(data), status)
         except Exception as e:
-            print(f"Error in send_json_response: {str(e)}")
-            print(f"Data being sent: {data}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error in send_json_response: %s", e)
+            logger.debug("Data being sent: %s", data)
             raise
 
+    def send_cacheable_json(self, body: bytes) -> None:
+        """
+        Send a cached JSON body with an ETag, or 304 if the client already has it.
+        
+        The tag is weak because the same JSON goes out both plain and gzipped.
+        """
+        etag = 'W/' + _json_etag(body)
+        if _etag_matches(self.headers.get('If-None-Match'), etag[2:]):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Vary', 'Accept-Encoding')
+            self.end_headers()
+            return
+        self.send_json_body(body, etag=etag)
+
+    def send_json_body(self, response: bytes, status: int = HTTPStatus.OK,
+                       etag: Optional[str] = None) -> None:
+        """Send already-encoded JSON, compressing it if the client allows."""
+        gzipped = len(response) >= _GZIP_MIN_SIZE and self.accepts_gzip()
+        if gzipped:
+            response = _gzip_json(response)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        if gzipped:
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('Content-Length', len(response))
+        if etag is not None:
+            self.send_header('ETag', etag)
+            # Revalidate on every poll; an unchanged page costs only a 304
+            self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Access-Control-Allow-Origin', '*')  # Allow CORS
+        self.end_headers()
+        self.wfile.write(response)
+
+class ChatServer(http.server.ThreadingHTTPServer):
+    """Threaded HTTP server: each connection gets its own thread."""
+    
+    # Must be set on the class; bind() has already run by the time
+    # an instance attribute could take effect
+    allow_reuse_address = True
+    # Don't let lingering keep-alive threads hold up shutdown
+    daemon_threads = True
+
+def configure_logging(level: int = logging.INFO) -> None:
+    """
+    Route log records through a queue to a background listener thread.
+    
+    Request threads format each record and put it on the queue; only the
+    console write happens on the listener thread, so slow stdout/stderr
+    never blocks request handling. Calling this again while logging is
+    already configured does nothing.
+    
+    Args:
+        level: Minimum level to log
+    """
+    global _log_listener, _log_handler
+    if _log_listener is not None:
+        return
+    log_queue = queue.SimpleQueue()
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    _log_listener = logging.handlers.QueueListener(log_queue, console)
+    _log_handler = logging.handlers.QueueHandler(log_queue)
+    root = logging.getLogger()
+    root.addHandler(_log_handler)
+    root.setLevel(level)
+    _log_listener.start()
+
+def stop_logging() -> None:
+    """Flush queued log records and undo configure_logging()."""
+    global _log_listener, _log_handler
+    if _log_listener is None:
+        return
+    logging.getLogger().removeHandler(_log_handler)
+    _log_listener.stop()
+    _log_listener = None
+    _log_handler = None
+
 def run_server(port: int = 8090) -> None:
     """
     Run the HTTP server on the specified port.
@@ -408,22 +1309,25 @@ def run_server(port: int = 8090) -> None:
     Args:
         port: Port number to listen on
     """
+    configure_logging()
+    preload_static_files()
     server = None
     try:
-        print(f"Starting server on port {port}...")
-        server = socketserver.TCPServer(("", port), MessageHandler)
-        server.allow_reuse_address = True
-        print(f"Server is running at http://localhost:{port}")
+        logger.info("Starting server on port %d...", port)
+        if MessageHandler.db_manager is None:
+            MessageHandler.db_manager = DatabaseManager()
+        server = ChatServer(("", port), MessageHandler)
+        logger.info("Server is running at http://localhost:%d", port)
         server.serve_forever()
     except OSError as e:
         if e.errno == 48:  # Address already in use
-            print(f"Error: Port {port} is already in use. Please try a different port or restart the server.")
+            logger.error("Port %d is already in use. Please try a different port or restart the server.", port)
         else:
-            print(f"Error starting server: {e}")
+            logger.error("Error starting server: %s", e)
     except KeyboardInterrupt:
-        print("\nShutting down server...")
+        logger.info("Shutting down server...")
     except Exception as e:
-        print(f"Unexpected error: {e}")
+        logger.error("Unexpected error: %s", e)
     finally:
         if server:
             try:
@@ -431,6 +1335,10 @@ def run_server(port: int = 8090) -> None:
                 server.server_close()
             except Exception:
                 pass
+        if MessageHandler.db_manager is not None:
+            # Commit any messages still queued for the writer thread
+            MessageHandler.db_manager.close()
+        stop_logging()
 
 if __name__ == "__main__":
     run_server()
@@ -3,7 +3,6 @@
 import unittest
 import os
 import json
-import shutil
 import tempfile
 from unittest.mock import patch, MagicMock
 from pathlib import Path
@@ -13,30 +12,44 @@ from git_manager import GitManager
 class TestGitManager(unittest.TestCase):
     """Test cases for GitManager class."""
 
-    def setUp(self):
-        """Set up test environment before each test."""
-        # Create a temporary directory for testing
-        self.test_dir = tempfile.mkdtemp()
-        
-        # Mock environment variables
-        self.env_patcher = patch.dict('os.environ', {
+    @classmethod
+    def setUpClass(cls):
+        """Set the GitHub environment variables once for the whole class."""
+        # Tests that need other values can nest their own patch.dict
+        cls.env_patcher = patch.dict('os.environ', {
             'GITHUB_TOKEN': 'test_token',
             'GITHUB_USERNAME': 'test_user',
             'GITHUB_REPO': 'test_repo'
         })
-        self.env_patcher.start()
+        cls.env_patcher.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Restore the environment."""
+        cls.env_patcher.stop()
+
+    def setUp(self):
+        """Set up test environment before each test."""
+        # Create a temporary directory for testing, removed even if setUp fails later
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.test_dir = tmp.name
+        
+        # No test may shell out to real git or reach GitHub; tests that
+        # run git commands set self.mock_run's return value or side effect
+        run_patcher = patch('git_manager.subprocess.run')
+        self.mock_run = run_patcher.start()
+        self.addCleanup(run_patcher.stop)
+        network_patcher = patch(
+            'git_manager.requests.get',
+            side_effect=AssertionError("tests must not make network requests")
+        )
+        network_patcher.start()
+        self.addCleanup(network_patcher.stop)
         
         # Initialize GitManager with test directory
         self.git_manager = GitManager(repo_path=self.test_dir)
 
-    def tearDown(self):
-        """Clean up test environment after each test."""
-        # Remove the temporary directory
-        shutil.rmtree(self.test_dir)
-        
-        # Stop environment variables patch
-        self.env_patcher.stop()
-
     def test_init(self):
         """Test GitManager initialization."""
         self.assertEqual(self.git_manager.repo_path, self.test_dir)
@@ -67,11 +80,10 @@ class TestGitManager(unittest.TestCase):
             self.assertEqual(message_data['author'], author)
             self.assertTrue('timestamp' in message_data)
 
-    @patch('subprocess.run')
-    def test_push_message_success(self, mock_run):
+    def test_push_message_success(self):
         """Test successful message push to GitHub."""
         # Mock successful git commands
-        mock_run.side_effect = [
+        self.mock_run.side_effect = [
             MagicMock(returncode=0),  # git add
             MagicMock(returncode=0),  # git commit
             MagicMock(returncode=0, stdout="test_hash\n"),  # git rev-parse
@@ -87,13 +99,12 @@ class TestGitManager(unittest.TestCase):
         self.assertEqual(result, "test_hash")
         
         # Verify git commands were called
-        self.assertEqual(mock_run.call_count, 4)
+        self.assertEqual(self.mock_run.call_count, 4)
 
-    @patch('subprocess.run')
-    def test_push_message_failure(self, mock_run):
+    def test_push_message_failure(self):
         """Test failed message push to GitHub."""
         # Mock failed git command
-        mock_run.side_effect = subprocess.CalledProcessError(
+        self.mock_run.side_effect = subprocess.CalledProcessError(
             1, "git", output="error message"
         )
         
@@ -105,11 +116,10 @@ class TestGitManager(unittest.TestCase):
         # Verify result
         self.assertIsNone(result)
 
-    @patch('subprocess.run')
-    def test_clone_repository_success(self, mock_run):
+    def test_clone_repository_success(self):
         """Test successful repository cloning."""
         # Mock successful git clone
-        mock_run.return_value = MagicMock(returncode=0)
+        self.mock_run.return_value = MagicMock(returncode=0)
         
         result = self.git_manager.clone_repository()
         
@@ -117,19 +127,18 @@ class TestGitManager(unittest.TestCase):
         self.assertTrue(result)
         
         # Verify git clone was called with correct arguments
-        mock_run.assert_called_once()
-        args = mock_run.call_args[0][0]
+        self.mock_run.assert_called_once()
+        args = self.mock_run.call_args[0][0]
         self.assertEqual(args[0], "git")
         self.assertEqual(args[1], "clone")
         self.assertTrue("test_token" in args[2])
         self.assertTrue("test_user" in args[2])
         self.assertTrue("test_repo" in args[2])
 
-    @patch('subprocess.run')
-    def test_clone_repository_failure(self, mock_run):
+    def test_clone_repository_failure(self):
         """Test failed repository cloning."""
         # Mock failed git clone
-        mock_run.side_effect = subprocess.CalledProcessError(
+        self.mock_run.side_effect = subprocess.CalledProcessError(
             1, "git", output="error message"
         )
         
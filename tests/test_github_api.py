@@ -1,9 +1,10 @@
 #!/usr/bin/env python3
 
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 import json
 import os
+from types import SimpleNamespace
 import sys
 import requests
 
@@ -11,9 +12,76 @@ import requests
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from git_manager import GitManager, GitHubError
 
+# GitHub API payloads shared by the tests; nothing modifies them
+MOCK_COMMITS = [
+    {
+        "sha": "abc123",
+        "commit": {
+            "message": "Test commit",
+            "author": {
+                "name": "Test Author",
+                "date": "2025-01-07T16:12:37-05:00"
+            }
+        },
+        "html_url": "https://github.com/test/test/commit/abc123"
+    }
+]
+
+MOCK_COMMIT = {
+    "sha": "abc123",
+    "commit": {
+        "message": "Test commit",
+        "author": {
+            "name": "Test Author",
+            "date": "2025-01-07T16:12:37-05:00"
+        }
+    },
+    "html_url": "https://github.com/test/test/commit/abc123",
+    "stats": {
+        "additions": 10,
+        "deletions": 5,
+        "total": 15
+    },
+    "files": [
+        {
+            "filename": "test.py",
+            "status": "modified",
+            "additions": 10,
+            "deletions": 5,
+            "changes": 15
+        }
+    ]
+}
+
+COMMITS_LINK_HEADER = (
+    '<https://api.github.com/repos/test/test/commits?page=2>; rel="next", '
+    '<https://api.github.com/repos/test/test/commits?page=3>; rel="last"'
+)
+
+def fake_response(json_data, headers=None, status_code=200) -> SimpleNamespace:
+    """
+    Build a stand-in for a successful requests.Response.
+    
+    Only requests.get itself needs to be a MagicMock, for its call
+    assertions; the response is plain attributes, so a typo in one raises
+    AttributeError instead of returning a new mock.
+    """
+    return SimpleNamespace(
+        json=lambda: json_data,
+        headers=headers or {},
+        status_code=status_code,
+        raise_for_status=lambda: None
+    )
+
 class TestGitHubAPI(unittest.TestCase):
     """Test cases for GitHub API integration."""
 
+    @classmethod
+    def setUpClass(cls):
+        """Build the canned API responses once for every test."""
+        cls.commits_response = fake_response(MOCK_COMMITS, {"Link": COMMITS_LINK_HEADER})
+        cls.commit_response = fake_response(MOCK_COMMIT)
+
     def setUp(self):
         """Set up test fixtures."""
         self.git_manager = GitManager(
@@ -31,30 +99,7 @@ class TestGitHubAPI(unittest.TestCase):
     @patch('requests.get')
     def test_get_commit_messages_success(self, mock_get):
         """Test successful retrieval of commit messages."""
-        # Mock response data
-        mock_commits = [
-            {
-                "sha": "abc123",
-                "commit": {
-                    "message": "Test commit",
-                    "author": {
-                        "name": "Test Author",
-                        "date": "2025-01-07T16:12:37-05:00"
-                    }
-                },
-                "html_url": "https://github.com/test/test/commit/abc123"
-            }
-        ]
-        
-        # Mock response
-        mock_response = MagicMock()
-        mock_response.json.return_value = mock_commits
-        mock_response.headers = {
-            "Link": '<https://api.github.com/repos/test/test/commits?page=2>; rel="next", '
-                   '<https://api.github.com/repos/test/test/commits?page=3>; rel="last"'
-        }
-        mock_response.status_code = 200
-        mock_get.return_value = mock_response
+        mock_get.return_value = self.commits_response
 
         # Get commit messages with per_page=30
         result = self.git_manager.get_commit_messages(per_page=30)
@@ -87,38 +132,7 @@ class TestGitHubAPI(unittest.TestCase):
     @patch('requests.get')
     def test_get_commit_by_sha_success(self, mock_get):
         """Test successful retrieval of a specific commit."""
-        # Mock response data
-        mock_commit = {
-            "sha": "abc123",
-            "commit": {
-                "message": "Test commit",
-                "author": {
-                    "name": "Test Author",
-                    "date": "2025-01-07T16:12:37-05:00"
-                }
-            },
-            "html_url": "https://github.com/test/test/commit/abc123",
-            "stats": {
-                "additions": 10,
-                "deletions": 5,
-                "total": 15
-            },
-            "files": [
-                {
-                    "filename": "test.py",
-                    "status": "modified",
-                    "additions": 10,
-                    "deletions": 5,
-                    "changes": 15
-                }
-            ]
-        }
-
-        # Mock response
-        mock_response = MagicMock()
-        mock_response.json.return_value = mock_commit
-        mock_response.status_code = 200
-        mock_get.return_value = mock_response
+        mock_get.return_value = self.commit_response
 
         # Get commit details
         result = self.git_manager.get_commit_by_sha("abc123")
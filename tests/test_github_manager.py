@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+import requests
+
+# Add parent directory to path to import github_manager
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from github_manager import GitHubManager
+
+class TestGitHubManager(unittest.TestCase):
+    """Test cases for the GitHub API session."""
+
+    @patch.dict(os.environ, {'GITHUB_TOKEN': 'test_token'})
+    def setUp(self):
+        """Set up test fixtures."""
+        self.github = GitHubManager()
+
+    def test_session_is_pooled(self):
+        """Test that HTTPS requests share a pooled adapter."""
+        adapter = self.github.session.get_adapter('https://api.github.com/rate_limit')
+        self.assertEqual(adapter._pool_maxsize, 4)
+        self.assertEqual(self.github.session.headers['Authorization'], 'token test_token')
+
+    def test_warm_up_success(self):
+        """Test that warm_up hits the free rate_limit endpoint."""
+        with patch.object(self.github.session, 'get') as mock_get:
+            mock_get.return_value = MagicMock(status_code=200)
+            self.assertTrue(self.github.warm_up())
+            mock_get.assert_called_once_with('https://api.github.com/rate_limit', timeout=10)
+
+    def test_warm_up_failure(self):
+        """Test that warm_up reports network errors instead of raising."""
+        with patch.object(self.github.session, 'get') as mock_get:
+            mock_get.side_effect = requests.exceptions.ConnectionError("offline")
+            self.assertFalse(self.github.warm_up())
+
+if __name__ == '__main__':
+    unittest.main()
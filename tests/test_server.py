@@ -2,137 +2,142 @@
 
 import unittest
 import json
+import gzip
 import os
 import sqlite3
 import tempfile
-import shutil
 import threading
 import http.server
-import socketserver
+import socket
 import requests
 import time
 from pathlib import Path
 from typing import Optional, Tuple, List
 from unittest.mock import patch, MagicMock
+from concurrent.futures import Future
 
 # Import our server modules
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from server import MessageHandler, DatabaseManager, run_server
+from server import (
+    MessageHandler, DatabaseManager, ChatServer, run_server, accepts_gzip, parse_message_query,
+    _json_dumps, _json_loads,
+    _parse_timestamp, _format_timestamp,
+    _content_type, _resolve_static_path, _load_static_file, _etag_matches, _MAX_CACHED_FILE_SIZE
+)
+import server
 from git_manager import GitManager
 
 class TestServer(unittest.TestCase):
     """Test cases for the messaging server."""
-    
-    server = None
-    server_thread = None
 
     @classmethod
     def setUpClass(cls):
         """Set up the test server in a separate thread."""
-        # Create a temporary directory for the test database and messages
-        cls.test_dir = tempfile.mkdtemp()
+        # Create a temporary directory for the test database; it is removed
+        # after tearDownClass has closed every connection to it
+        cls._tmp = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(cls._tmp.cleanup)
+        cls.test_dir = cls._tmp.name
         cls.db_path = os.path.join(cls.test_dir, "test_messages.db")
-        cls.messages_dir = os.path.join(cls.test_dir, "messages")
-        os.makedirs(cls.messages_dir, exist_ok=True)
 
         # Initialize the test database
         cls.init_test_database()
 
-        # Find an available port
-        cls.server_port = cls.find_available_port()
+        class TestMessageHandler(MessageHandler):
+            # Handlers read the shared manager from the class attribute
+            db_manager = cls.db_manager
+
+        # Bind port 0 here, before the thread starts: the OS picks a free
+        # port nobody can take in between, and connections made before
+        # serve_forever() runs wait in the listen backlog
+        cls.server = ChatServer(("", 0), TestMessageHandler)
+        cls.server_port = cls.server.server_address[1]
+        cls.base_url = f"http://localhost:{cls.server_port}"
         
-        # Start the test server
+        # Start the test server; shutdown() waits for the next poll,
+        # which defaults to every half second
         cls.server_thread = threading.Thread(
-            target=cls.run_test_server,
-            args=(cls.server_port, cls.db_path)
+            target=cls.server.serve_forever,
+            kwargs={'poll_interval': 0.05}
         )
         cls.server_thread.daemon = True
         cls.server_thread.start()
-
-        # Wait for server to start
-        time.sleep(1)
+        
+        # One keep-alive connection serves all the tests' requests
+        cls.session = requests.Session()
 
     @classmethod
     def tearDownClass(cls):
         """Clean up after all tests."""
         # Stop the server
-        if cls.server:
-            cls.server.shutdown()
-            cls.server.server_close()
-        
-        # Remove temporary directory
-        shutil.rmtree(cls.test_dir)
-
-    @classmethod
-    def find_available_port(cls) -> int:
-        """Find an available port to use for testing."""
-        with socketserver.TCPServer(("", 0), None) as s:
-            return s.server_address[1]
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.session.close()
+        cls.conn.close()
+        cls.db_manager.close()
 
     @classmethod
     def init_test_database(cls):
-        """Initialize the test database with the schema."""
-        with sqlite3.connect(cls.db_path) as conn:
-            conn.executescript("""
-                CREATE TABLE IF NOT EXISTS messages (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    content TEXT NOT NULL,
-                    timestamp TEXT NOT NULL,
-                    author TEXT,
-                    git_commit_hash TEXT,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
-                );
-            """)
-
-    @classmethod
-    def run_test_server(cls, port: int, db_path: str):
-        """Run the test server with the test database."""
-        class TestMessageHandler(MessageHandler):
-            def __init__(self, *args, **kwargs):
-                self.db_manager = DatabaseManager(db_path=db_path)
-                self.git_manager = GitManager(repo_path=os.path.dirname(db_path))
-                super(http.server.SimpleHTTPRequestHandler, self).__init__(*args, **kwargs)
-
-        cls.server = socketserver.TCPServer(("", port), TestMessageHandler)
-        cls.server.serve_forever()
+        """Initialize the test database with the server's own schema."""
+        cls.db_manager = DatabaseManager(db_path=cls.db_path)
+        # One connection for fixture writes, reused by every test
+        cls.conn = sqlite3.connect(cls.db_path)
 
     def setUp(self):
         """Set up each test."""
-        self.base_url = f"http://localhost:{self.server_port}"
-        
         # Mock Git operations
-        self.git_patcher = patch('git_manager.GitManager.push_message')
-        self.mock_git_push = self.git_patcher.start()
+        git_patcher = patch('git_manager.GitManager.push_message')
+        self.mock_git_push = git_patcher.start()
+        self.addCleanup(git_patcher.stop)
         self.mock_git_push.return_value = "test_commit_hash"
         
-        # Clear database
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("DELETE FROM messages")
-
-    def tearDown(self):
-        """Clean up after each test."""
-        self.git_patcher.stop()
-
-    def create_test_messages(self, count: int) -> List[dict]:
-        """Create a specified number of test messages."""
-        messages = []
-        for i in range(count):
-            message = {
-                "content": f"Test message {i + 1}",
-                "author": f"TestUser{i + 1}"
-            }
-            response = requests.post(
-                f"{self.base_url}/messages",
-                json=message
+        # Clear database, bumping the version as DatabaseManager writes do
+        # so cached responses from the previous test are dropped
+        with self.conn:
+            self.conn.execute("DELETE FROM messages")
+        self.db_manager.version += 1
+
+    @classmethod
+    def seed_messages(cls, count: int) -> None:
+        """Insert count messages straight into the database, one second apart."""
+        start = _parse_timestamp("2025-01-07T15:00:00+00:00")
+        rows = [
+            (f"Test message {i + 1}", start + i * 1_000_000, f"TestUser{i + 1}")
+            for i in range(count)
+        ]
+        with cls.conn:
+            cls.conn.executemany(
+                "INSERT INTO messages (content, timestamp, author) VALUES (?, ?, ?)", rows
             )
-            self.assertEqual(response.status_code, 200)
-            messages.append(message)
-        return messages
+        # Drop cached responses, as DatabaseManager writes do
+        cls.db_manager.version += 1
+
+    def test_unchanged_responses_revalidate_with_etag(self):
+        """Test that repeat polls with a matching ETag get an empty 304."""
+        self.seed_messages(3)
+        for path in ("/messages", "/repositories"):
+            with self.subTest(path=path):
+                first = self.session.get(f"{self.base_url}{path}")
+                etag = first.headers["ETag"]
+                self.assertTrue(etag.startswith('W/"'))
+                self.assertEqual(first.headers["Cache-Control"], "no-cache")
+                
+                again = self.session.get(f"{self.base_url}{path}", headers={"If-None-Match": etag})
+                self.assertEqual(again.status_code, 304)
+                self.assertEqual(again.content, b"")
+                self.assertEqual(again.headers["ETag"], etag)
+        
+        # A new message changes the page and its tag
+        etag = self.session.get(f"{self.base_url}/messages").headers["ETag"]
+        self.seed_messages(1)
+        response = self.session.get(f"{self.base_url}/messages", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
 
     def test_get_messages_empty(self):
         """Test getting messages when database is empty."""
-        response = requests.get(f"{self.base_url}/messages")
+        response = self.session.get(f"{self.base_url}/messages")
         self.assertEqual(response.status_code, 200)
         
         data = response.json()
@@ -144,75 +149,49 @@ class TestServer(unittest.TestCase):
     def test_get_messages_pagination(self):
         """Test message pagination."""
         # Create 25 test messages
-        test_messages = self.create_test_messages(25)
+        self.seed_messages(25)
         
-        # Test first page
-        response = requests.get(f"{self.base_url}/messages?limit=10&offset=0")
-        self.assertEqual(response.status_code, 200)
-        
-        data = response.json()
-        self.assertEqual(len(data["messages"]), 10)
-        self.assertEqual(data["pagination"]["total"], 25)
-        self.assertTrue(data["pagination"]["has_more"])
-        
-        # Test second page
-        response = requests.get(f"{self.base_url}/messages?limit=10&offset=10")
-        self.assertEqual(response.status_code, 200)
-        
-        data = response.json()
-        self.assertEqual(len(data["messages"]), 10)
-        self.assertEqual(data["pagination"]["offset"], 10)
-        self.assertTrue(data["pagination"]["has_more"])
-        
-        # Test last page
-        response = requests.get(f"{self.base_url}/messages?limit=10&offset=20")
-        self.assertEqual(response.status_code, 200)
-        
-        data = response.json()
-        self.assertEqual(len(data["messages"]), 5)
-        self.assertEqual(data["pagination"]["offset"], 20)
-        self.assertFalse(data["pagination"]["has_more"])
+        # First, second and last page of 10
+        for offset, expected_len, has_more in ((0, 10, True), (10, 10, True), (20, 5, False)):
+            with self.subTest(offset=offset):
+                response = self.session.get(f"{self.base_url}/messages?limit=10&offset={offset}")
+                self.assertEqual(response.status_code, 200)
+                
+                data = response.json()
+                self.assertEqual(len(data["messages"]), expected_len)
+                self.assertEqual(data["pagination"]["total"], 25)
+                self.assertEqual(data["pagination"]["offset"], offset)
+                self.assertEqual(data["pagination"]["has_more"], has_more)
 
     def test_get_messages_sorting(self):
         """Test message sorting."""
         # Create test messages
-        test_messages = self.create_test_messages(3)
-        
-        # Test ascending order
-        response = requests.get(f"{self.base_url}/messages?sort=ASC")
-        self.assertEqual(response.status_code, 200)
-        
-        data = response.json()
-        messages = data["messages"]
-        self.assertEqual(len(messages), 3)
-        
-        # Verify ascending order
-        timestamps = [msg["timestamp"] for msg in messages]
-        self.assertEqual(timestamps, sorted(timestamps))
-        
-        # Test descending order
-        response = requests.get(f"{self.base_url}/messages?sort=DESC")
-        self.assertEqual(response.status_code, 200)
+        self.seed_messages(3)
         
-        data = response.json()
-        messages = data["messages"]
-        
-        # Verify descending order
-        timestamps = [msg["timestamp"] for msg in messages]
-        self.assertEqual(timestamps, sorted(timestamps, reverse=True))
+        for sort, descending in (("ASC", False), ("DESC", True)):
+            with self.subTest(sort=sort):
+                response = self.session.get(f"{self.base_url}/messages?sort={sort}")
+                self.assertEqual(response.status_code, 200)
+                
+                messages = response.json()["messages"]
+                self.assertEqual(len(messages), 3)
+                
+                # Verify the order
+                timestamps = [msg["timestamp"] for msg in messages]
+                self.assertEqual(timestamps, sorted(timestamps, reverse=descending))
 
     def test_get_messages_invalid_parameters(self):
         """Test invalid pagination parameters."""
         # Test invalid limit
-        response = requests.get(f"{self.base_url}/messages?limit=invalid")
+        response = self.session.get(f"{self.base_url}/messages?limit=invalid")
         self.assertEqual(response.status_code, 400)
         
         # Test invalid offset
-        response = requests.get(f"{self.base_url}/messages?offset=invalid")
+        response = self.session.get(f"{self.base_url}/messages?offset=invalid")
         self.assertEqual(response.status_code, 400)
         
         # Test invalid sort order
-        response = requests.get(f"{self.base_url}/messages?sort=INVALID")
+        response = self.session.get(f"{self.base_url}/messages?sort=INVALID")
         self.assertEqual(response.status_code, 200)  # Should use default DESC
         data = response.json()
         self.assertIn("messages", data)
@@ -220,10 +199,10 @@ class TestServer(unittest.TestCase):
     def test_get_messages_default_parameters(self):
         """Test default pagination parameters."""
         # Create more than default limit messages
-        test_messages = self.create_test_messages(25)
+        self.seed_messages(25)
         
         # Test with no parameters
-        response = requests.get(f"{self.base_url}/messages")
+        response = self.session.get(f"{self.base_url}/messages")
         self.assertEqual(response.status_code, 200)
         
         data = response.json()
@@ -239,11 +218,11 @@ class TestServer(unittest.TestCase):
             "content": "Test message for GET",
             "author": "TestUser"
         }
-        response = requests.post(f"{self.base_url}/messages", json=message_data)
+        response = self.session.post(f"{self.base_url}/messages", json=message_data)
         self.assertEqual(response.status_code, 200)
         
         # Get messages
-        response = requests.get(f"{self.base_url}/messages")
+        response = self.session.get(f"{self.base_url}/messages")
         self.assertEqual(response.status_code, 200)
         
         data = response.json()
@@ -267,7 +246,7 @@ class TestServer(unittest.TestCase):
             "author": "TestUser"
         }
         
-        response = requests.post(f"{self.base_url}/messages", json=message_data)
+        response = self.session.post(f"{self.base_url}/messages", json=message_data)
         self.assertEqual(response.status_code, 200)
         
         # Verify response
@@ -277,14 +256,58 @@ class TestServer(unittest.TestCase):
         self.assertEqual(data["git_hash"], "test_commit_hash")
         
         # Verify database storage
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+        with self.conn:
+            cursor = self.conn.cursor()
             cursor.execute("SELECT content, author FROM messages WHERE id = ?", (data["id"],))
             row = cursor.fetchone()
             self.assertIsNotNone(row)
             self.assertEqual(row[0], message_data["content"])
             self.assertEqual(row[1], message_data["author"])
 
+    def test_post_message_wrong_types(self):
+        """Test posting a message whose fields aren't strings."""
+        for message_data in (
+            {"content": ["not", "a", "string"], "author": "TestUser"},
+            {"content": "Test message", "author": {"name": "TestUser"}},
+            ["not", "an", "object"],
+        ):
+            with self.subTest(message_data=message_data):
+                response = self.session.post(f"{self.base_url}/messages", json=message_data)
+                self.assertEqual(response.status_code, 400)
+
+    def test_post_body_too_large(self):
+        """Test that an oversized body is refused before it is read."""
+        with socket.create_connection(("localhost", self.server_port)) as client:
+            client.settimeout(5)
+            client.sendall(
+                b"POST /messages HTTP/1.1\r\nHost: localhost\r\n"
+                b"Content-Type: application/json\r\nContent-Length: 1000000000\r\n\r\n"
+            )
+            response = client.makefile("rb").read()
+        # The server closes the connection instead of waiting for the body
+        self.assertTrue(response.startswith(b"HTTP/1.1 413 "))
+
+    def test_push_without_github(self):
+        """Test that /push reports a disabled integration instead of blocking."""
+        response = self.session.post(f"{self.base_url}/push")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()["status"], "disabled")
+        
+        status = self.session.get(f"{self.base_url}/push/status").json()
+        self.assertEqual(
+            status, {"enabled": False, "pending": False, "running": False, "last_push": None}
+        )
+
+    def test_idle_connection_does_not_block_other_clients(self):
+        """Test that an idle keep-alive connection doesn't stall other clients."""
+        with socket.create_connection(("localhost", self.server_port)) as idle:
+            idle.sendall(b"GET / HTTP/1.1\r\nHost: localhost\r\n\r\n")
+            # Read the start of the response but leave the connection open
+            self.assertTrue(idle.recv(1))
+            
+            response = self.session.get(f"{self.base_url}/", timeout=5)
+            self.assertEqual(response.status_code, 200)
+
     def test_post_invalid_message(self):
         """Test posting an invalid message."""
         message_data = {
@@ -292,9 +315,653 @@ class TestServer(unittest.TestCase):
             # Missing required content field
         }
         
-        response = requests.post(f"{self.base_url}/messages", json=message_data)
+        response = self.session.post(f"{self.base_url}/messages", json=message_data)
         self.assertEqual(response.status_code, 400)
 
+class TestStaticFiles(unittest.TestCase):
+    """Test cases for static file lookup and caching."""
+
+    def setUp(self):
+        """Create a temporary static directory."""
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.test_dir = tmp.name
+        self.static_dir = os.path.join(self.test_dir, "static")
+        os.makedirs(os.path.join(self.static_dir, "v1.2"))
+        _load_static_file.cache_clear()
+        # Forget files cached from the temporary static directory
+        self.addCleanup(_load_static_file.cache_clear)
+
+    def write_file(self, name: str, content: bytes) -> str:
+        """Write a file into the static directory and return its path."""
+        filepath = os.path.join(self.static_dir, name)
+        with open(filepath, 'wb') as f:
+            f.write(content)
+        return filepath
+
+    def test_content_type(self):
+        """Test content type lookup by extension."""
+        self.assertEqual(_content_type(os.path.join("static", "app.js")), "application/javascript")
+        self.assertEqual(_content_type(os.path.join("static", "style.css")), "text/css")
+        self.assertEqual(_content_type(os.path.join("static", "LICENSE")), "application/octet-stream")
+        self.assertEqual(_content_type(os.path.join("static", "v1.2", "LICENSE")), "application/octet-stream")
+        self.assertEqual(_content_type(os.path.join("static", "v1.2", "app.css")), "text/css")
+
+    def test_resolve_rejects_traversal(self):
+        """Test that paths outside the static directory are rejected."""
+        self.write_file("app.js", b"")
+        self.assertEqual(
+            _resolve_static_path("app.js", self.static_dir),
+            os.path.join(os.path.realpath(self.static_dir), "app.js")
+        )
+        self.assertIsNone(_resolve_static_path("../secret.env", self.static_dir))
+        self.assertIsNone(_resolve_static_path("v1.2/../../secret.env", self.static_dir))
+        self.assertIsNone(_resolve_static_path("/etc/passwd", self.static_dir))
+
+    def test_small_file_is_cached(self):
+        """Test that small files are read from disk only once."""
+        filepath = self.write_file("app.js", b"first")
+        content, content_type, etag = _load_static_file(filepath)
+        self.assertEqual((content, content_type), (b"first", "application/javascript"))
+        
+        self.write_file("app.js", b"second")
+        self.assertEqual(_load_static_file(filepath), (b"first", "application/javascript", etag))
+        self.assertEqual(_load_static_file.cache_info().hits, 1)
+        
+        # The ETag follows the content
+        _load_static_file.cache_clear()
+        self.assertNotEqual(_load_static_file(filepath)[2], etag)
+
+    def test_etag_matches(self):
+        """Test If-None-Match comparison, including lists, weak tags and '*'."""
+        self.assertTrue(_etag_matches('"abc"', '"abc"'))
+        self.assertTrue(_etag_matches('"xyz", W/"abc"', '"abc"'))
+        self.assertTrue(_etag_matches('*', '"abc"'))
+        self.assertFalse(_etag_matches('"xyz"', '"abc"'))
+        self.assertFalse(_etag_matches(None, '"abc"'))
+
+    def test_large_file_is_not_cached(self):
+        """Test that files over the size cap are left on disk."""
+        filepath = self.write_file("big.png", b"x" * (_MAX_CACHED_FILE_SIZE + 1))
+        self.assertEqual(_load_static_file(filepath), (None, "image/png", None))
+
+    def test_copy_file(self):
+        """Test that copy_file sends the whole file to the client."""
+        filepath = self.write_file("big.png", b"x" * 100000)
+        handler = MessageHandler.__new__(MessageHandler)
+        server_sock, client_sock = socket.socketpair()
+        received = []
+        
+        def read_all():
+            while True:
+                chunk = client_sock.recv(65536)
+                if not chunk:
+                    break
+                received.append(chunk)
+        
+        with server_sock, client_sock:
+            reader = threading.Thread(target=read_all)
+            reader.start()
+            handler.connection = server_sock
+            handler.wfile = server_sock.makefile('wb')
+            handler.close_connection = False
+            # Buffered headers must reach the client before the file
+            handler.wfile.write(b"HEADERS")
+            with open(filepath, 'rb') as f:
+                handler.copy_file(f, 100000)
+            server_sock.shutdown(socket.SHUT_WR)
+            reader.join()
+        
+        self.assertEqual(b"".join(received), b"HEADERS" + b"x" * 100000)
+        self.assertFalse(handler.close_connection)
+
+    def test_copy_file_short_file_closes_connection(self):
+        """Test that a file shorter than its Content-Length drops the connection."""
+        filepath = self.write_file("app.js", b"short")
+        handler = MessageHandler.__new__(MessageHandler)
+        server_sock, client_sock = socket.socketpair()
+        with server_sock, client_sock:
+            handler.connection = server_sock
+            handler.wfile = server_sock.makefile('wb')
+            handler.close_connection = False
+            with open(filepath, 'rb') as f:
+                handler.copy_file(f, 100)
+            self.assertTrue(handler.close_connection)
+            self.assertEqual(client_sock.recv(100), b"short")
+
+    def test_missing_file(self):
+        """Test that missing files raise FileNotFoundError."""
+        with self.assertRaises(FileNotFoundError):
+            _load_static_file(os.path.join(self.static_dir, "missing.js"))
+
+class TestResponseCache(unittest.TestCase):
+    """Test cases for the version-keyed GET response cache."""
+
+    def setUp(self):
+        """Build a handler backed by a fake database manager."""
+        self.handler = MessageHandler.__new__(MessageHandler)
+        self.handler.db_manager = MagicMock(version=0)
+        self.build = MagicMock(return_value=b'{"messages":[]}')
+
+    def test_hit_skips_build(self):
+        """Test that a repeated key is served without rebuilding."""
+        first = self.handler.cached_json(('messages', 1), self.build)
+        second = self.handler.cached_json(('messages', 1), self.build)
+        self.assertEqual(first, b'{"messages":[]}')
+        self.assertIs(first, second)
+        self.build.assert_called_once()
+
+    def test_write_invalidates(self):
+        """Test that bumping the database version drops cached bodies."""
+        self.handler.cached_json(('messages', 1), self.build)
+        self.handler.db_manager.version += 1
+        self.handler.cached_json(('messages', 1), self.build)
+        self.assertEqual(self.build.call_count, 2)
+
+    def test_gzip_reused_for_cached_body(self):
+        """Test that a cached body is compressed only once."""
+        server._gzip_json.cache_clear()
+        body = _json_dumps({"messages": ["x" * 2048]})
+        with patch('server.gzip.compress', wraps=gzip.compress) as compress:
+            first = server._gzip_json(body)
+            self.assertIs(server._gzip_json(body), first)
+        compress.assert_called_once()
+        self.assertEqual(gzip.decompress(first), body)
+
+class TestJsonCodec(unittest.TestCase):
+    """Test cases for JSON encoding and decoding."""
+
+    DATA = {"messages": [{"id": 1, "content": "h\u00e9llo \"quoted\"", "author": None}], "has_more": False}
+
+    def test_compact_utf8(self):
+        """Test that output is compact UTF-8 JSON."""
+        encoded = _json_dumps(self.DATA)
+        self.assertEqual(json.loads(encoded), self.DATA)
+        self.assertNotIn(b", ", encoded)
+        self.assertIn("h\u00e9llo".encode('utf-8'), encoded)
+
+    def test_fallback_matches_orjson(self):
+        """Test that the json fallback produces the same bytes."""
+        encoded = _json_dumps(self.DATA)
+        with patch('server.orjson', None):
+            self.assertEqual(_json_dumps(self.DATA), encoded)
+
+    def test_loads(self):
+        """Test that bodies decode the same with and without orjson."""
+        encoded = _json_dumps(self.DATA)
+        self.assertEqual(_json_loads(encoded), self.DATA)
+        with patch('server.orjson', None):
+            self.assertEqual(_json_loads(encoded), self.DATA)
+
+    def test_loads_rejects_bad_input(self):
+        """Test that malformed JSON and invalid UTF-8 raise the errors do_POST maps to 400."""
+        for orjson_module in (server.orjson, None):
+            with patch('server.orjson', orjson_module):
+                for body in (b'{"content": ', b'{"content": "\xff"}'):
+                    with self.subTest(orjson=orjson_module is not None, body=body):
+                        with self.assertRaises((json.JSONDecodeError, UnicodeDecodeError)):
+                            _json_loads(body)
+
+class TestRequestLogging(unittest.TestCase):
+    """Test cases for request logging."""
+
+    def setUp(self):
+        """Build a handler without a live connection."""
+        self.handler = MessageHandler.__new__(MessageHandler)
+        self.handler.client_address = ("127.0.0.1", 12345)
+
+    def test_log_message_escapes_control_characters(self):
+        """Test that escape sequences in request lines are neutralised."""
+        with self.assertLogs('server', level='INFO') as logs:
+            self.handler.log_message('"%s" %s', "GET /\x1b[31mred HTTP/1.1", "200")
+        self.assertEqual(logs.records[0].levelname, "INFO")
+        self.assertIn("\\x1b[31mred", logs.output[0])
+        self.assertNotIn("\x1b", logs.output[0])
+
+    def test_log_error_uses_error_level(self):
+        """Test that server errors are logged at ERROR level."""
+        with self.assertLogs('server', level='ERROR') as logs:
+            self.handler.log_error("code %d, message %s", 500, "Internal server error")
+        self.assertEqual(logs.records[0].levelname, "ERROR")
+
+class TestAcceptsGzip(unittest.TestCase):
+    """Test cases for Accept-Encoding negotiation."""
+
+    def test_plain_gzip(self):
+        """Test that a bare gzip token is accepted."""
+        self.assertTrue(accepts_gzip("gzip, deflate, br"))
+
+    def test_missing_header(self):
+        """Test that no header means no compression."""
+        self.assertFalse(accepts_gzip(""))
+        self.assertFalse(accepts_gzip("identity"))
+
+    def test_zero_qvalue_refuses_gzip(self):
+        """Test that gzip;q=0 is treated as a refusal."""
+        self.assertFalse(accepts_gzip("gzip;q=0"))
+        self.assertFalse(accepts_gzip("deflate, gzip; q=0.0"))
+        self.assertTrue(accepts_gzip("gzip;q=0.5"))
+
+    def test_wildcard(self):
+        """Test that * applies only when gzip isn't listed explicitly."""
+        self.assertTrue(accepts_gzip("*"))
+        self.assertFalse(accepts_gzip("*;q=0"))
+        self.assertFalse(accepts_gzip("gzip;q=0, *"))
+
+class TestParseMessageQuery(unittest.TestCase):
+    """Test cases for GET /messages query parsing."""
+    
+    def test_defaults(self):
+        """Test that an empty query yields the default page."""
+        self.assertEqual(parse_message_query(""), {
+            'limit': 20,
+            'offset': 0,
+            'sort_order': 'DESC',
+            'repository_ids': None,
+            'cursor': None
+        })
+    
+    def test_limit_bounds(self):
+        """Test that 0 and 1000 are accepted and values outside are rejected."""
+        self.assertEqual(parse_message_query("limit=0")['limit'], 0)
+        self.assertEqual(parse_message_query("limit=1000")['limit'], 1000)
+        for query in ("limit=-1", "limit=1001", "limit=abc"):
+            with self.subTest(query=query):
+                with self.assertRaises(ValueError):
+                    parse_message_query(query)
+    
+    def test_negative_offset(self):
+        """Test that a negative offset is rejected."""
+        with self.assertRaises(ValueError):
+            parse_message_query("offset=-1")
+    
+    def test_bad_sort_falls_back_to_desc(self):
+        """Test that sort is case-insensitive and unknown orders become DESC."""
+        self.assertEqual(parse_message_query("sort=asc")['sort_order'], 'ASC')
+        self.assertEqual(parse_message_query("sort=sideways")['sort_order'], 'DESC')
+    
+    def test_repositories(self):
+        """Test that repositories parses to a tuple and rejects empty ids."""
+        self.assertEqual(parse_message_query("repositories=1,2")['repository_ids'], (1, 2))
+        with self.assertRaises(ValueError):
+            parse_message_query("repositories=1,,2")
+    
+    def test_repeated_keys_keep_last_value(self):
+        """Test that the last occurrence of a repeated key wins."""
+        params = parse_message_query("limit=5&limit=7&sort=ASC&sort=DESC")
+        self.assertEqual(params['limit'], 7)
+        self.assertEqual(params['sort_order'], 'DESC')
+    
+    def test_cursor(self):
+        """Test that before_* and after_* parse into a cursor matching the sort."""
+        # Timestamps are parsed to microseconds; without an offset they are UTC
+        self.assertEqual(
+            parse_message_query("before_ts=2025-01-07T15:00:00&before_id=5")['cursor'],
+            (1736262000000000, 5)
+        )
+        self.assertEqual(
+            parse_message_query("sort=ASC&after_ts=2025-01-07T10:00:00-05:00&after_id=5")['cursor'],
+            (1736262000000000, 5)
+        )
+        for query in ("before_ts=2025-01-07T15:00:00",
+                      "before_ts=yesterday&before_id=5",
+                      "before_ts=2025-01-07T15:00:00&before_id=x",
+                      "after_ts=2025-01-07T15:00:00&after_id=5",
+                      "before_ts=2025-01-07T15:00:00&before_id=5&offset=20"):
+            with self.subTest(query=query):
+                with self.assertRaises(ValueError):
+                    parse_message_query(query)
+
+class TestTimestamps(unittest.TestCase):
+    """Test cases for integer timestamp conversion."""
+
+    def test_round_trip(self):
+        """Test that microseconds survive parsing and formatting."""
+        self.assertEqual(_parse_timestamp("1970-01-01T00:00:01.000002+00:00"), 1000002)
+        self.assertEqual(
+            _format_timestamp(_parse_timestamp("2025-01-19T20:10:10.596998+00:00")),
+            "2025-01-19T20:10:10.596998+00:00"
+        )
+
+    def test_offsets_normalize_to_utc(self):
+        """Test that timestamps with other offsets format as the same instant in UTC."""
+        self.assertEqual(
+            _format_timestamp(_parse_timestamp("2025-01-07T15:33:47-05:00")),
+            "2025-01-07T20:33:47+00:00"
+        )
+
+class TestDatabaseManager(unittest.TestCase):
+    """Test cases for DatabaseManager writes."""
+
+    def setUp(self):
+        """Create a fresh database in a temporary directory."""
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.test_dir = tmp.name
+        self.db_manager = DatabaseManager(db_path=os.path.join(self.test_dir, "messages.db"))
+        # Cleanups run last-in first-out, so the database closes before
+        # its directory is removed
+        self.addCleanup(self.db_manager.close)
+
+    def test_connection_pragmas(self):
+        """Test that the database runs in WAL mode with the tuned settings."""
+        conn = self.db_manager.get_connection()
+        try:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+            self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)
+            self.assertEqual(conn.execute("PRAGMA busy_timeout").fetchone()[0], 5000)
+            self.assertEqual(conn.execute("PRAGMA foreign_keys").fetchone()[0], 1)
+        finally:
+            conn.close()
+
+    def test_save_message_returns_id(self):
+        """Test that save_message returns the id of each new message."""
+        first = self.db_manager.save_message("Hello", "2025-01-07T15:00:00+00:00", "TestUser")
+        second = self.db_manager.save_message("Again", "2025-01-07T15:01:00+00:00", "TestUser")
+        self.assertEqual(second, first + 1)
+        self.assertEqual(self.db_manager.version, 2)
+        
+        messages = self.db_manager.get_messages(sort_order="ASC")
+        self.assertEqual([m["id"] for m in messages], [first, second])
+        self.assertEqual(messages[0]["repository"], "default")
+
+    def test_concurrent_saves_are_batched(self):
+        """Test that messages saved from many threads all get distinct ids."""
+        ids = []
+        threads = [
+            threading.Thread(target=lambda i=i: ids.append(
+                self.db_manager.save_message(f"Message {i}", "2025-01-07T15:00:00+00:00", "TestUser")
+            ))
+            for i in range(20)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(len(set(ids)), 20)
+        self.assertEqual(self.db_manager.get_message_count(), 20)
+
+    @patch('server._PUSH_DEBOUNCE', 0.2)
+    @patch('server.GitHubManager')
+    @patch.dict(os.environ, {'GITHUB_TOKEN': 'test_token'})
+    def test_burst_of_messages_pushes_once(self, mock_github):
+        """Test that pushes run off the request thread, once per burst."""
+        db_manager = DatabaseManager(db_path=os.path.join(self.test_dir, "github.db"))
+        self.addCleanup(db_manager.close)
+        with patch.object(db_manager, 'push_to_github') as mock_push:
+            for i in range(5):
+                db_manager.save_message(f"Message {i}", "2025-01-07T15:00:00+00:00", "TestUser")
+            mock_push.assert_not_called()
+            time.sleep(0.5)
+            mock_push.assert_called_once()
+
+    @patch('server._PUSH_DEBOUNCE', 0.2)
+    @patch('server.GitHubManager')
+    @patch.dict(os.environ, {'GITHUB_TOKEN': 'test_token'})
+    def test_requested_push_runs_in_background(self, mock_github):
+        """Test that schedule_push returns at once and the outcome shows in push_status."""
+        db_manager = DatabaseManager(db_path=os.path.join(self.test_dir, "github.db"))
+        self.addCleanup(db_manager.close)
+        with patch.object(db_manager, 'push_to_github', return_value=True) as mock_push:
+            self.assertTrue(db_manager.schedule_push())
+            self.assertTrue(db_manager.schedule_push())
+            self.assertTrue(db_manager.push_status()["pending"])
+            mock_push.assert_not_called()
+            time.sleep(0.5)
+            mock_push.assert_called_once()
+        status = db_manager.push_status()
+        self.assertFalse(status["pending"])
+        self.assertEqual(status["last_push"]["status"], "success")
+
+    @patch('server.subprocess.run')
+    def test_push_to_github_commits_database_directly(self, mock_run):
+        """Test that a push commits messages.db by pathspec, without a separate git add."""
+        mock_run.return_value = MagicMock(returncode=0)
+        self.db_manager.github_enabled = True
+        self.db_manager.github = MagicMock()
+        self.assertTrue(self.db_manager.push_to_github())
+        
+        commands = [call.args[0] for call in mock_run.call_args_list]
+        self.assertEqual(len(commands), 2)
+        self.assertEqual(commands[0][:2], ['git', 'commit'])
+        self.assertEqual(commands[0][-2:], ['--', 'database/messages.db'])
+        self.assertEqual(commands[1], ['git', 'push', 'origin', 'main'])
+
+    def test_unstamped_messages_follow_id_order(self):
+        """Test that messages saved without a timestamp get non-decreasing ones."""
+        ids = [self.db_manager.save_message(f"Message {i}", None, "TestUser") for i in range(3)]
+        messages = self.db_manager.get_messages(sort_order="ASC")
+        self.assertEqual([m["id"] for m in messages], ids)
+        timestamps = [m["timestamp"] for m in messages]
+        self.assertEqual(timestamps, sorted(timestamps))
+        self.assertTrue(timestamps[0].endswith("+00:00"))
+
+    def test_unknown_repository_is_rejected(self):
+        """Test that foreign keys stop messages pointing at missing repositories."""
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.db_manager.save_message("Hello", None, "TestUser", repository_id=99)
+        self.assertEqual(self.db_manager.get_message_count(), 0)
+
+    def test_failed_insert_only_fails_its_own_message(self):
+        """Test that a row violating a constraint does not fail the rest of its batch."""
+        good, bad = Future(), Future()
+        self.db_manager._insert_messages([
+            ((1, "Hello", 1736262000000000, "TestUser"), good),
+            ((1, None, 1736262000000000, "TestUser"), bad)
+        ])
+        self.assertIsInstance(good.result(), int)
+        self.assertIsInstance(bad.exception(), sqlite3.IntegrityError)
+        self.assertEqual(self.db_manager.get_message_count(), 1)
+
+    def test_reads_use_pooled_connections(self):
+        """Test that reads reuse pooled read-only connections and see new writes."""
+        with self.db_manager.read_connection() as first:
+            pass
+        other = []
+        thread = threading.Thread(target=lambda: other.append(self.db_manager.get_message_count()))
+        with self.db_manager.read_connection() as conn:
+            self.assertIs(conn, first)
+            with self.db_manager.read_connection() as nested:
+                self.assertIsNot(nested, conn)
+            # Other threads borrow from the same pool
+            thread.start()
+            thread.join()
+            self.assertEqual(other, [0])
+            with self.assertRaises(sqlite3.OperationalError):
+                conn.execute("DELETE FROM messages")
+        
+        self.assertEqual(self.db_manager.get_message_count(), 0)
+        self.db_manager.save_message("Hello", "2025-01-07T15:00:00+00:00", "TestUser")
+        self.assertEqual(self.db_manager.get_message_count(), 1)
+
+    def test_get_messages_cursor(self):
+        """Test that keyset pages continue after the cursor in both directions."""
+        # Two messages share a timestamp so the id breaks the tie
+        ids = [
+            self.db_manager.save_message(f"Message {i}", timestamp, "TestUser")
+            for i, timestamp in enumerate([
+                "2025-01-07T15:00:00+00:00",
+                "2025-01-07T15:01:00+00:00",
+                "2025-01-07T15:01:00+00:00",
+                "2025-01-07T15:02:00+00:00"
+            ])
+        ]
+        
+        newest = self.db_manager.get_messages(limit=2)
+        self.assertEqual([m["id"] for m in newest], [ids[3], ids[2]])
+        older = self.db_manager.get_messages(
+            limit=2, cursor=(_parse_timestamp(newest[-1]["timestamp"]), newest[-1]["id"])
+        )
+        self.assertEqual([m["id"] for m in older], [ids[1], ids[0]])
+        
+        newer = self.db_manager.get_messages(
+            sort_order="ASC", cursor=(_parse_timestamp("2025-01-07T15:01:00+00:00"), ids[1])
+        )
+        self.assertEqual([m["id"] for m in newer], [ids[2], ids[3]])
+
+    def test_get_messages_limit_and_offset(self):
+        """Test bound LIMIT/OFFSET, including no limit at all."""
+        for i in range(5):
+            self.db_manager.save_message(f"Message {i}", f"2025-01-07T15:0{i}:00+00:00", "TestUser")
+        
+        self.assertEqual(len(self.db_manager.get_messages()), 5)
+        page = self.db_manager.get_messages(limit=2, offset=1, sort_order="ASC")
+        self.assertEqual([m["content"] for m in page], ["Message 1", "Message 2"])
+        self.assertEqual(
+            [m["content"] for m in self.db_manager.get_messages(offset=3, sort_order="ASC")],
+            ["Message 3", "Message 4"]
+        )
+        
+        # The newest page is read straight off the (timestamp, id) index
+        with self.db_manager.read_connection() as conn:
+            plan = conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM messages m ORDER BY m.timestamp DESC, m.id DESC LIMIT 1"
+            ).fetchall()
+        self.assertIn("idx_messages_timestamp_id", plan[0][3])
+
+    def test_filter_by_repository(self):
+        """Test that repository filters apply to both pages and counts."""
+        repo_id = self.db_manager.add_repository("Repo", "https://github.com/test/repo")
+        self.db_manager.save_message("Default", "2025-01-07T15:00:00+00:00", "TestUser")
+        self.db_manager.save_message("Tracked", "2025-01-07T15:01:00+00:00", "TestUser", repo_id)
+        
+        messages = self.db_manager.get_messages(repository_ids=(repo_id,))
+        self.assertEqual([m["content"] for m in messages], ["Tracked"])
+        self.assertEqual(messages[0]["repository"], "Repo")
+        self.assertEqual(self.db_manager.get_message_count((repo_id,)), 1)
+        self.assertEqual(self.db_manager.get_message_count((1, repo_id)), 2)
+        self.assertEqual(self.db_manager.get_message_count(), 2)
+        self.assertEqual(
+            [m["content"] for m in self.db_manager.get_messages(repository_ids=(1, repo_id))],
+            ["Tracked", "Default"]
+        )
+        
+        # A single repository's page comes off idx_messages_repo already sorted
+        with self.db_manager.read_connection() as conn:
+            plan = conn.execute(
+                "EXPLAIN QUERY PLAN " + server._SQL_SELECT_MESSAGES[("DESC", 1, False)],
+                (repo_id, 20, 0)
+            ).fetchall()
+        self.assertFalse(any("TEMP B-TREE" in row[3] for row in plan))
+
+    def test_get_messages_rejects_unknown_sort_order(self):
+        """Test that sort_order never reaches the SQL unless it is ASC or DESC."""
+        with self.assertRaises(ValueError):
+            self.db_manager.get_messages(sort_order="id; DROP TABLE messages")
+
+    def test_encode_messages_page(self):
+        """Test that the streamed page encodes to the full response envelope."""
+        for i in range(3):
+            self.db_manager.save_message(f"Message {i}", f"2025-01-07T15:0{i}:00+00:00", "TestUser")
+        handler = MessageHandler.__new__(MessageHandler)
+        handler.db_manager = self.db_manager
+        
+        page = json.loads(handler.encode_messages_page(parse_message_query("limit=2")))
+        self.assertEqual(page["messages"], self.db_manager.get_messages(limit=2))
+        self.assertEqual(page["pagination"], {
+            "total": 3,
+            "limit": 2,
+            "offset": 0,
+            "has_more": True,
+            "next_cursor": {"before_ts": "2025-01-07T15:01:00+00:00", "before_id": 2}
+        })
+        
+        last = json.loads(handler.encode_messages_page(parse_message_query(
+            "limit=2&before_ts=2025-01-07T15:01:00%2B00:00&before_id=2"
+        )))
+        self.assertEqual([m["content"] for m in last["messages"]], ["Message 0"])
+        self.assertFalse(last["pagination"]["has_more"])
+        self.assertIsNone(last["pagination"]["next_cursor"])
+
+    def test_migrates_text_timestamps(self):
+        """Test that an older database with ISO text timestamps is converted in place."""
+        db_path = os.path.join(self.test_dir, "legacy.db")
+        with sqlite3.connect(db_path) as conn:
+            conn.executescript("""
+                CREATE TABLE messages (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    repository_id INTEGER NOT NULL,
+                    content TEXT NOT NULL,
+                    timestamp TEXT NOT NULL,
+                    author TEXT,
+                    message_type TEXT,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP, git_commit_hash TEXT
+                );
+                CREATE INDEX idx_messages_git_hash ON messages(git_commit_hash);
+                INSERT INTO messages (repository_id, content, timestamp, author, message_type, created_at)
+                VALUES (1, 'Late', '2025-01-19T20:10:10.596998+00:00', 'A', 'note', '2025-01-19 20:10:10'),
+                       (1, 'Early', '2025-01-07T15:33:47-05:00', 'B', NULL, '2025-01-19 20:10:38'),
+                       (1, 'Deleted', '2025-01-20T00:00:00+00:00', 'C', NULL, '2025-01-20 00:00:00');
+                DELETE FROM messages WHERE id = 3;
+            """)
+        conn.close()
+        
+        db_manager = DatabaseManager(db_path=db_path)
+        self.addCleanup(db_manager.close)
+        
+        # The -05:00 message is now ordered by instant, not by its text
+        messages = db_manager.get_messages(sort_order="ASC")
+        self.assertEqual([m["content"] for m in messages], ["Early", "Late"])
+        self.assertEqual(messages[0]["timestamp"], "2025-01-07T20:33:47+00:00")
+        
+        with db_manager.read_connection() as conn:
+            row = conn.execute(
+                "SELECT typeof(timestamp), typeof(created_at), message_type FROM messages WHERE id = 1"
+            ).fetchone()
+            indexes = {r["name"] for r in conn.execute("PRAGMA index_list(messages)")}
+        self.assertEqual(tuple(row), ("integer", "integer", "note"))
+        self.assertIn("idx_messages_git_hash", indexes)
+        self.assertIn("idx_messages_timestamp_id", indexes)
+        
+        # New messages and reopening both work on the migrated table
+        self.assertEqual(db_manager.save_message("New", None, "C"), 4)
+        self.assertEqual(db_manager.get_message_count(), 3)
+        DatabaseManager(db_path=db_path).close()
+
+    def test_add_repository(self):
+        """Test adding new and existing repositories."""
+        repo_id = self.db_manager.add_repository("Repo", "https://github.com/test/repo")
+        self.assertNotEqual(repo_id, 1)
+        
+        # Adding the same url again returns the existing id
+        self.assertEqual(
+            self.db_manager.add_repository("Renamed", "https://github.com/test/repo"),
+            repo_id
+        )
+        self.assertEqual(self.db_manager.add_repository("default", "default"), 1)
+        repositories = self.db_manager.get_repositories()
+        self.assertEqual(len(repositories), 2)
+        self.assertEqual(
+            {key: repositories[1][key] for key in ("id", "name", "url", "is_active")},
+            {"id": repo_id, "name": "Repo", "url": "https://github.com/test/repo", "is_active": 1}
+        )
+
+    def test_repositories_json_survives_new_messages(self):
+        """Test that the cached repository list is rebuilt only when repositories change."""
+        handler = MessageHandler.__new__(MessageHandler)
+        handler.db_manager = self.db_manager
+        with patch.object(self.db_manager, 'get_repositories', wraps=self.db_manager.get_repositories) as spy:
+            first = handler.repositories_json()
+            self.db_manager.save_message("Hello", None, "TestUser")
+            self.assertIs(handler.repositories_json(), first)
+            spy.assert_called_once()
+            
+            self.db_manager.add_repository("Repo", "https://github.com/test/repo")
+            repositories = json.loads(handler.repositories_json())["repositories"]
+            self.assertEqual([r["name"] for r in repositories], ["default", "Repo"])
+            self.assertEqual(spy.call_count, 2)
+
+    @patch('server._SQLITE_HAS_RETURNING', False)
+    def test_add_repository_without_returning(self):
+        """Test the INSERT OR IGNORE fallback for SQLite without RETURNING."""
+        repo_id = self.db_manager.add_repository("Repo", "https://github.com/test/repo")
+        self.assertEqual(
+            self.db_manager.add_repository("Repo", "https://github.com/test/repo"),
+            repo_id
+        )
+        self.assertEqual(self.db_manager.add_repository("default", "default"), 1)
+
 def main():
     unittest.main()
 